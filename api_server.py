@@ -0,0 +1,605 @@
+# api_server.py
+
+# Streamlit UI chara (mobile app, batch job) YES Ai chalanor headless HTTP/JSON API:
+# login, chat turn (NDJSON streaming soho), history ar search. Agent loop, tool ar
+# database.py ek-i code ja app.py use kore. Server asyncio-r (stdlib, notun dependency
+# nei): ekta event loop onek connection dhore rakhe, ar blocking kaj - bcrypt, SQLite,
+# Gemini stream, tool - alada bounded thread pool-e chole. Pool-er queue bhorti hole
+# request wait na kore 503 + Retry-After pay.
+#
+# Run:  GEMINI_API_KEY=... python api_server.py --port 8080
+#
+#   POST /login          {"email", "password"} -> {"token", "user"}
+#   POST /logout
+#   GET  /conversations
+#   GET  /history        ?conversation_id=&before_id=&limit=
+#   GET  /search         ?q=&offset=
+#   POST /chat           {"message", "conversation_id"?, "research"?, "stream"?}
+#   GET  /health
+#
+# /login ar /health chara shob request-e "Authorization: Bearer <token>" lage. Streaming
+# chat-er response application/x-ndjson: {"text": ...} line-gulo, shesh-e {"done": true}.
+
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import database as db
+from chat_context import build_chat_context
+from main_agent import (
+    GEMINI_CONTEXT_CACHE, GEMINI_CONTEXT_CACHE_TTL, SYSTEM_INSTRUCTION, agent_prompt, build_model,
+    stream_cached_turn,
+)
+from tools.registry import TOOLS as AGENT_TOOLS
+from tracing import span
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+# Ek-shathe koto connection khola thakte pare; beshi hole notun connection 503 pay
+API_MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "1000"))
+# Chat turn-e ekta thread puro stream dhore rakhe (beshir bhag model ar tool-er wait, CPU na)
+API_AGENT_WORKERS = int(os.getenv("API_AGENT_WORKERS", "64"))
+# SQLite connection pool-er shoman; er beshi thread shudhu pool-er jonno wait korto
+API_DB_WORKERS = int(os.getenv("API_DB_WORKERS", str(db.POOL_SIZE)))
+# bcrypt CPU-bound (GIL chhere dey), tai core-er shoman thread
+API_AUTH_WORKERS = int(os.getenv("API_AUTH_WORKERS", str(os.cpu_count() or 2)))
+# Shob worker busy thakle protiti pool-e koto kaj wait korte pare, tar por 503
+API_MAX_QUEUED = int(os.getenv("API_MAX_QUEUED", "256"))
+# Streaming turn-e koto chunk client-e pathanor jonno wait korte pare; client dheere
+# porle model-er stream-o thame, memory-te answer jome na
+API_STREAM_BUFFER = 16
+# Client eto second kichu na porle (ba request shesh na korle) connection bondho
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+API_WRITE_TIMEOUT = float(os.getenv("API_WRITE_TIMEOUT", "30"))
+API_MAX_BODY = 64 * 1024
+API_MAX_HEADERS = 100
+# Koto (user, conversation)-er ChatSession memory-te thake; baki-gulo DB theke abar toiri hoy
+API_CHAT_CACHE_SIZE = int(os.getenv("API_CHAT_CACHE_SIZE", "2000"))
+RETRY_AFTER = "1"
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body, keep_alive):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+
+    def json(self) -> dict:
+        try:
+            payload = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Request body must be JSON")
+        if not isinstance(payload, dict):
+            raise HttpError(400, "Request body must be a JSON object")
+        return payload
+
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def int_param(self, name, default=None):
+        return _int(self.param(name), name, default)
+
+
+class Response:
+    """A JSON response, or a streamed one when stream is an async iterator of bytes."""
+
+    def __init__(self, status=200, payload=None, headers=None, stream=None):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+        self.stream = stream
+
+
+def _int(value, name, default=None):
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"'{name}' must be an integer")
+
+
+def _json_line(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+def _public_user(user) -> dict:
+    return {"id": user["id"], "username": user["username"], "email": user["email"]}
+
+
+class BoundedExecutor:
+    """
+    A thread pool that refuses work with a 503 once `workers + max_queued` calls are
+    pending, instead of queueing without limit. Calls run in a copy of the caller's
+    context, so their spans nest under the request's span.
+    """
+
+    def __init__(self, name, workers, max_queued=API_MAX_QUEUED):
+        self.name = name
+        self.workers = workers
+        self.limit = workers + max_queued
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"api-{name}")
+
+    def submit(self, function, *args, **kwargs) -> asyncio.Future:
+        """Schedules function on the pool; call from the event loop."""
+        if self.pending >= self.limit:
+            self.rejected += 1
+            raise HttpError(503, "Server is busy, please retry shortly", {"Retry-After": RETRY_AFTER})
+        self.pending += 1
+        call = functools.partial(contextvars.copy_context().run, function, *args, **kwargs)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        self.pending -= 1
+
+    async def run(self, function, *args, **kwargs):
+        return await self.submit(function, *args, **kwargs)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self.pending, "rejected": self.rejected}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TurnStream:
+    """
+    Hands an agent thread's text chunks to the event loop. At most API_STREAM_BUFFER
+    chunks wait unsent, so a slow client slows the model stream down instead of filling
+    memory. A client that stops reading for API_WRITE_TIMEOUT (or disconnects) is
+    detached: the turn still runs to the end and is saved, it just isn't sent anymore.
+    """
+
+    _END = object()
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(API_STREAM_BUFFER)
+        self._closed = False
+        self._detached = False
+
+    # --- agent thread side ---
+
+    def send(self, text):
+        if self._detached:
+            return
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._offer(text), self._loop)
+            delivered = future.result(API_WRITE_TIMEOUT + 1)
+        except (RuntimeError, FutureTimeoutError):
+            # Loop bondho (server shutdown)
+            delivered = False
+        if not delivered:
+            self._detached = True
+
+    def finish(self):
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, self._END)
+        except RuntimeError:
+            pass
+
+    # --- event loop side ---
+
+    async def _offer(self, text):
+        if not self._closed:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), API_WRITE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self._closed = True
+        if self._closed:
+            return False
+        self._queue.put_nowait(text)
+        return True
+
+    async def chunks(self):
+        try:
+            while (text := await self._queue.get()) is not self._END:
+                self._slots.release()
+                yield text
+        finally:
+            self.close()
+
+    def close(self):
+        # Slot-er jonno wait kora send() chhere dey; tar porer send() shorashori fire ashe
+        self._closed = True
+        self._slots.release()
+
+
+class ApiServer:
+    """
+    The HTTP API. model_factory() builds the shared Gemini model; it is called on the
+    first chat turn and again when the context cache is about to expire, like
+    app.py's load_gemini_model().
+    """
+
+    def __init__(self, model_factory, tools=AGENT_TOOLS):
+        self.tools = tools
+        self._model_factory = model_factory
+        self._model = None
+        self._model_expires = None
+        self._model_lock = threading.Lock()
+
+        self.auth_pool = BoundedExecutor("auth", API_AUTH_WORKERS)
+        self.db_pool = BoundedExecutor("db", API_DB_WORKERS)
+        self.agent_pool = BoundedExecutor("agent", API_AGENT_WORKERS)
+
+        # (user_id, conversation_id) -> ChatSession, shob theke purono aage
+        self._chats = OrderedDict()
+        self._chats_lock = threading.Lock()
+        # Je conversation-e ekhon turn cholche; ChatSession ek-shathe duto turn nite pare na
+        self._busy = set()
+        self.connections = 0
+        self.rejected_connections = 0
+
+        self._routes = {
+            ("POST", "/login"): self.login,
+            ("POST", "/logout"): self.logout,
+            ("GET", "/conversations"): self.conversations,
+            ("GET", "/history"): self.history,
+            ("GET", "/search"): self.search,
+            ("POST", "/chat"): self.chat,
+            ("GET", "/health"): self.health,
+        }
+
+    # --- Model ar ChatSession (agent thread-e chole) ---
+
+    def _get_model(self):
+        with self._model_lock:
+            if self._model is None or (self._model_expires and time.monotonic() >= self._model_expires):
+                self._model = self._model_factory()
+                if GEMINI_CONTEXT_CACHE:
+                    self._model_expires = time.monotonic() + max(GEMINI_CONTEXT_CACHE_TTL - 300, 60)
+            return self._model
+
+    def _take_chat(self, user_id, conversation_id):
+        model = self._get_model()
+        with self._chats_lock:
+            chat = self._chats.pop((user_id, conversation_id), None)
+        if chat is None:
+            history, _ = build_chat_context(user_id, conversation_id=conversation_id)
+            return model.start_chat(history=history)
+        # Shared model refresh hole history niye notun model-e jai
+        if chat.model is not model:
+            return model.start_chat(history=chat.history)
+        return chat
+
+    def _put_chat(self, user_id, conversation_id, chat):
+        with self._chats_lock:
+            self._chats[(user_id, conversation_id)] = chat
+            while len(self._chats) > API_CHAT_CACHE_SIZE:
+                self._chats.popitem(last=False)
+
+    def _run_turn(self, user_id, conversation_id, message, research_mode, stream=None) -> str:
+        """
+        One chat turn, the same flow as app.py's show_chat_turns(): saves the prompt,
+        streams the agent's answer (into stream, if given) and saves the answer.
+        """
+        chat = None
+        chunks = []
+        tickets = []
+        try:
+            # Prompt queue korar aage chat nite hobe: cache miss-e build_chat_context pending
+            # write flush kore history pore, tokhon prompt-ta history-te dhuke duibar jeto
+            try:
+                chat = self._take_chat(user_id, conversation_id)
+            finally:
+                tickets.append(db.queue_message(user_id, "user", message, conversation_id))
+            for chunk in stream_cached_turn(chat, agent_prompt(message, research_mode), self.tools, research_mode):
+                chunks.append(chunk)
+                if stream:
+                    stream.send(chunk)
+        except Exception as e:
+            print(f"An error occurred in the API chat turn: {e}")
+            chunk = f"Sorry, an internal error occurred: {e}"
+            chunks.append(chunk)
+            if stream:
+                stream.send(chunk)
+            # ChatSession-er obostha jana nei; porer turn DB theke abar toiri hobe
+            chat = None
+        finally:
+            if stream:
+                stream.finish()
+
+        answer = "".join(chunks)
+        tickets.append(db.queue_message(user_id, "assistant", answer, conversation_id))
+        if chat is not None:
+            self._put_chat(user_id, conversation_id, chat)
+        # Writer fail korle confirm_messages() nijei save_message() diye abar likhe
+        if not db.confirm_messages(tickets):
+            print(f"API chat turn for user {user_id} was not fully saved to conversation {conversation_id}")
+        return answer
+
+    # --- Handlers ---
+
+    async def _authenticate(self, request):
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        user = None
+        if scheme.lower() == "bearer" and token.strip():
+            user = await self.db_pool.run(db.get_session_user, token.strip())
+        if user is None:
+            raise HttpError(401, "Login required", {"WWW-Authenticate": "Bearer"})
+        return user
+
+    async def _conversation(self, user, conversation_id, reopen=False):
+        """
+        The requested conversation or the current one. reopen=True un-archives it (and
+        thaws cold storage) like picking it in the sidebar; otherwise only ownership is checked.
+        """
+        conversation_id = _int(conversation_id, "conversation_id")
+        if conversation_id is None:
+            return await self.db_pool.run(db.current_conversation, user["id"])
+        # Shudhu porle (GET /history) conversation-er archived/cold obostha bodlano jabe na
+        check = db.open_conversation if reopen else db.owns_conversation
+        if not await self.db_pool.run(check, user["id"], conversation_id):
+            raise HttpError(404, "Conversation not found")
+        return conversation_id
+
+    async def login(self, request):
+        body = request.json()
+        email, password = body.get("email"), body.get("password")
+        if not isinstance(email, str) or not isinstance(password, str):
+            raise HttpError(400, "'email' and 'password' are required")
+        user = await self.auth_pool.run(db.check_user, email, password)
+        if user is None:
+            raise HttpError(401, "Incorrect email or password.")
+        token = await self.db_pool.run(db.create_session, user["id"])
+        return Response(200, {"token": token, "user": _public_user(user)})
+
+    async def logout(self, request):
+        await self._authenticate(request)
+        token = request.headers["authorization"].partition(" ")[2].strip()
+        await self.db_pool.run(db.revoke_session, token)
+        return Response(200, {"ok": True})
+
+    async def conversations(self, request):
+        user = await self._authenticate(request)
+        rows = await self.db_pool.run(db.list_conversations, user["id"])
+        return Response(200, {"conversations": [dict(row) for row in rows]})
+
+    async def history(self, request):
+        user = await self._authenticate(request)
+        conversation_id = await self._conversation(user, request.param("conversation_id"))
+        limit = min(max(request.int_param("limit", db.HISTORY_PAGE_SIZE), 1), db.HISTORY_PAGE_SIZE * 4)
+        rows, cursor = await self.db_pool.run(
+            db.load_history_page, user["id"], limit, request.int_param("before_id"), conversation_id)
+        return Response(200, {
+            "conversation_id": conversation_id,
+            "messages": [dict(row) for row in rows],
+            "next_before_id": cursor,
+        })
+
+    async def search(self, request):
+        user = await self._authenticate(request)
+        query = request.param("q", "")
+        offset = max(request.int_param("offset", 0), 0)
+        rows, next_offset = await self.db_pool.run(db.search_history, user["id"], query, offset=offset)
+        return Response(200, {"results": [dict(row) for row in rows], "next_offset": next_offset})
+
+    async def chat(self, request):
+        user = await self._authenticate(request)
+        body = request.json()
+        message = body.get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HttpError(400, "'message' is required")
+        research_mode = bool(body.get("research", False))
+        conversation_id = await self._conversation(user, body.get("conversation_id"), reopen=True)
+
+        key = (user["id"], conversation_id)
+        if key in self._busy:
+            raise HttpError(409, "A reply is still being written in this conversation")
+        stream = TurnStream(asyncio.get_running_loop()) if body.get("stream", True) else None
+        turn = self.agent_pool.submit(self._run_turn, user["id"], conversation_id, message, research_mode, stream)
+        self._busy.add(key)
+        turn.add_done_callback(lambda _: self._busy.discard(key))
+
+        if stream is None:
+            answer = await asyncio.shield(turn)
+            return Response(200, {"conversation_id": conversation_id, "answer": answer})
+
+        async def ndjson():
+            try:
+                async for text in stream.chunks():
+                    yield _json_line({"text": text})
+            finally:
+                stream.close()
+            yield _json_line({"done": True, "conversation_id": conversation_id})
+
+        return Response(200, stream=ndjson())
+
+    async def health(self, request):
+        return Response(200, {
+            "status": "ok",
+            "connections": self.connections,
+            "rejected_connections": self.rejected_connections,
+            "turns_running": len(self._busy),
+            "chat_sessions": len(self._chats),
+            "pools": {pool.name: pool.stats() for pool in (self.auth_pool, self.db_pool, self.agent_pool)},
+            "db_pool": db.pool_stats(),
+            "cpu_s": time.process_time(),
+        })
+
+    # --- HTTP ---
+
+    async def handle_connection(self, reader, writer):
+        if self.connections >= API_MAX_CONNECTIONS:
+            self.rejected_connections += 1
+            error = Response(503, {"error": "Too many connections"}, {"Retry-After": RETRY_AFTER})
+            await self._close(writer, error)
+            return
+
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), API_READ_TIMEOUT)
+                except HttpError as e:
+                    await self._write_response(writer, Response(e.status, {"error": e.message}, e.headers), False)
+                    break
+                if request is None:
+                    break
+                response = await self._dispatch(request)
+                await self._write_response(writer, response, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            await self._close(writer)
+
+    async def _close(self, writer, response=None):
+        try:
+            if response is not None:
+                await self._write_response(writer, response, False)
+            writer.close()
+            await writer.wait_closed()
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+
+    async def _read_request(self, reader):
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                raise HttpError(400, "Malformed request line")
+
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                if len(headers) >= API_MAX_HEADERS:
+                    raise HttpError(431, "Too many headers")
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            # StreamReader-er line limit-er cheye boro line
+            raise HttpError(431, "Request line or header too long")
+
+        if "transfer-encoding" in headers:
+            raise HttpError(411, "Content-Length required")
+        length = _int(headers.get("content-length"), "Content-Length", 0)
+        if length < 0 or length > API_MAX_BODY:
+            raise HttpError(413, f"Request body over {API_MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return Request(method.upper(), url.path, parse_qs(url.query), headers, body, keep_alive)
+
+    async def _dispatch(self, request):
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            allowed = [method for method, path in self._routes if path == request.path]
+            if allowed:
+                return Response(405, {"error": "Method not allowed"}, {"Allow": ", ".join(allowed)})
+            return Response(404, {"error": "Not found"})
+        try:
+            with span(f"api{request.path.replace('/', '.')}"):
+                return await handler(request)
+        except HttpError as e:
+            return Response(e.status, {"error": e.message}, e.headers)
+        except Exception as e:
+            print(f"API error on {request.method} {request.path}: {e}")
+            return Response(500, {"error": "Internal server error"})
+
+    async def _write_response(self, writer, response, keep_alive):
+        headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        if response.stream is None:
+            body = _json_line(response.payload) if response.payload is not None else b""
+            headers["Content-Length"] = str(len(body))
+        else:
+            headers.update({
+                "Content-Type": "application/x-ndjson; charset=utf-8",
+                "Transfer-Encoding": "chunked",
+                "Cache-Control": "no-cache",
+            })
+        headers.update(response.headers)
+        status = HTTPStatus(response.status)
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+
+        if response.stream is None:
+            writer.write(head.encode("latin-1") + body)
+            await asyncio.wait_for(writer.drain(), API_WRITE_TIMEOUT)
+            return
+
+        writer.write(head.encode("latin-1"))
+        try:
+            async for data in response.stream:
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await asyncio.wait_for(writer.drain(), API_WRITE_TIMEOUT)
+            writer.write(b"0\r\n\r\n")
+            await asyncio.wait_for(writer.drain(), API_WRITE_TIMEOUT)
+        finally:
+            # Client chole gele TurnStream detach hoy; turn nije shesh hoy ar save hoy
+            await response.stream.aclose()
+
+    async def start(self, host=API_HOST, port=API_PORT):
+        """Starts listening and returns the asyncio server (port 0 picks a free port)."""
+        return await asyncio.start_server(self.handle_connection, host, port, limit=16 * 1024, backlog=1024)
+
+    def shutdown(self):
+        for pool in (self.auth_pool, self.db_pool, self.agent_pool):
+            pool.shutdown()
+        db.shutdown_writer()
+        db.close_all_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YES Ai headless HTTP API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        sys.exit("GEMINI_API_KEY is not set.")
+    api = ApiServer(lambda: build_model(api_key, AGENT_TOOLS, SYSTEM_INSTRUCTION))
+
+    async def serve():
+        server = await api.start(args.host, args.port)
+        print(f"YES Ai API listening on http://{args.host}:{server.sockets[0].getsockname()[1]}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.shutdown()
+
+
+if __name__ == "__main__":
+    main()
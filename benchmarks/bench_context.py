@@ -0,0 +1,53 @@
+# benchmarks/bench_context.py
+# Context rehydration: puro history replay korle koto prompt token lagto vs
+# token-budgeted builder (recent verbatim + cached rolling summary).
+#
+# Run from the repo root:  python -m benchmarks.bench_context
+
+import argparse
+import os
+import tempfile
+import time
+
+import chat_context
+import database as db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token-budgeted context rehydration benchmark")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--budget", type=int, default=chat_context.CONTEXT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    summarizer_calls = {"count": 0}
+
+    def counting_summarizer(previous, rows):
+        summarizer_calls["count"] += 1
+        return chat_context.extractive_summarizer(previous, rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        db.close_all_connections()
+        for i in range(args.messages):
+            role = "user" if i % 2 == 0 else "assistant"
+            db.queue_message(1, role, f"Message {i}: " + "some chat content about weather and news " * 6)
+        db.flush_messages()
+
+        for label in ("first login", "second login (cached summary)"):
+            start = time.perf_counter()
+            history, stats = chat_context.build_chat_context(1, counting_summarizer, args.budget)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label}: {elapsed:.1f} ms, summarizer calls so far: {summarizer_calls['count']}")
+
+        db.shutdown_writer()
+        db.close_all_connections()
+
+    print(f"stored messages     {stats['messages']}")
+    print(f"verbatim messages   {stats['verbatim_messages']}")
+    print(f"full replay tokens  {stats['full_tokens']}")
+    print(f"prompt tokens       {stats['prompt_tokens']}")
+    print(f"saved               {stats['saved_tokens']} ({stats['saved_tokens'] / max(1, stats['full_tokens']) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_database.py
+# Micro-benchmark: save_message / load_history ops/sec, purano
+# "connect per call + schema check" pattern vs pooled connections.
+#
+# Run from the repo root:  python -m benchmarks.bench_database
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+import database as db
+
+
+def _legacy_connection():
+    conn = sqlite3.connect(db.DATABASE_NAME)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _legacy_check():
+    # Ager check_db_exists()-er moto: notun connection + 2 ta sqlite_master lookup + demo user SELECT
+    conn = _legacy_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
+    cursor.fetchone()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chat_history'")
+    cursor.fetchone()
+    cursor.execute("SELECT id FROM users WHERE email = 'yesai.dev@gmail.com'")
+    cursor.fetchone()
+    conn.commit()
+    conn.close()
+
+
+def legacy_save_message(user_id, role, content):
+    _legacy_check()
+    conn = _legacy_connection()
+    conn.execute(
+        "INSERT INTO chat_history (user_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+        (user_id, role, content, datetime.now()))
+    conn.commit()
+    conn.close()
+
+
+def legacy_load_history(user_id):
+    _legacy_check()
+    conn = _legacy_connection()
+    rows = conn.execute(
+        "SELECT role, content FROM chat_history WHERE user_id = ? ORDER BY id", (user_id,)
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def _ops_per_sec(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite connection micro-benchmark")
+    parser.add_argument("--ops", type=int, default=2000, help="operations per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        db.close_all_connections()
+        db.init_db()
+
+        results = {
+            "save_message (before)": _ops_per_sec(
+                lambda i: legacy_save_message(1, "user", f"message {i}"), args.ops),
+            "save_message (after)": _ops_per_sec(
+                lambda i: db.save_message(2, "user", f"message {i}"), args.ops),
+            "load_history (before)": _ops_per_sec(
+                lambda i: legacy_load_history(1), args.ops // 10),
+            "load_history (after)": _ops_per_sec(
+                lambda i: db.load_history(2), args.ops // 10),
+        }
+        db.close_all_connections()
+
+    for name, ops in results.items():
+        print(f"{name:<24} {ops:>10.0f} ops/sec")
+
+
+if __name__ == "__main__":
+    main()
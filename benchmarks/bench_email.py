@@ -0,0 +1,66 @@
+# benchmarks/bench_email.py
+# OTP mail burst: protiti mail-e notun SMTP connection (ager send_otp_email) vs
+# background outbox-er pooled connection, ar server restart-er por outbox-er reconnect.
+# Local aiosmtpd stand-in server-e chole, real mail jay na. Dorkar: pip install aiosmtpd
+#
+# Run from the repo root:  python -m benchmarks.bench_email
+
+import argparse
+import smtplib
+import time
+
+from tools import email_tool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SMTP outbox benchmark against a local aiosmtpd server")
+    parser.add_argument("--emails", type=int, default=100)
+    args = parser.parse_args()
+
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Sink
+    except ImportError:
+        raise SystemExit("aiosmtpd is not installed: pip install aiosmtpd")
+
+    controller = Controller(Sink(), hostname="127.0.0.1", port=8025)
+    controller.start()
+    try:
+        email_tool.SMTP_HOST, email_tool.SMTP_PORT = "127.0.0.1", 8025
+        email_tool.SMTP_USE_SSL = False
+        email_tool.SENDER_EMAIL, email_tool.SENDER_PASSWORD = "bench@example.com", None
+
+        start = time.perf_counter()
+        for i in range(args.emails):
+            with smtplib.SMTP("127.0.0.1", 8025) as server:
+                server.sendmail("bench@example.com", f"user{i}@example.com",
+                                email_tool.build_otp_message("123456"))
+        per_connection = time.perf_counter() - start
+
+        start = time.perf_counter()
+        jobs = [email_tool.enqueue_otp_email(f"user{i}@example.com", "123456") for i in range(args.emails)]
+        enqueue_time = time.perf_counter() - start
+        statuses = [email_tool.wait_for_delivery(job) for job in jobs]
+        outbox_total = time.perf_counter() - start
+
+        # Outbox-er pooled connection ekhono khola; server restart-e seta drop hoy, tai
+        # porer mail-e prothom send fail kore ar outbox reconnect kore abar pathay
+        controller.stop()
+        # Stop kora Controller-er loop bondho, tai ek-i port-e notun server
+        controller = Controller(Sink(), hostname="127.0.0.1", port=8025)
+        controller.start()
+        reconnect_status = email_tool.wait_for_delivery(
+            email_tool.enqueue_otp_email("after-restart@example.com", "654321"))
+    finally:
+        controller.stop()
+
+    print(f"new connection per email   {args.emails / per_connection:8.1f} emails/sec")
+    print(f"pooled outbox              {args.emails / outbox_total:8.1f} emails/sec")
+    print(f"form latency (enqueue)     {enqueue_time / args.emails * 1e6:8.1f} us/email")
+    print(f"delivered                  {statuses.count('sent')}/{args.emails}")
+    print(f"reconnect after restart    {'OK' if reconnect_status == 'sent' else 'FAILED: ' + reconnect_status}")
+    assert reconnect_status == "sent", "the outbox should reconnect when its SMTP connection drops"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_gazetteer.py
+# Offline city index (tools/gazetteer.py):
+#   1. import ar prothom lookup-er cost (mmap, tai kichu load hoy na),
+#   2. exact, alias, "City, CC" ar bhul-banan lookup-er latency,
+#   3. weather cache: user-der lekha naam-er ek stream-e koto upstream call hoy -
+#      ager bhabe (normalize kora raw string key, bhul naam-o upstream-e 404) bonam
+#      ekhon (canonical city id key, ajana naam local-e reject).
+#
+# Run from the repo root:  python -m benchmarks.bench_gazetteer --queries 5000
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fakes import point_tools_at
+from benchmarks.stub_server import StubServer
+from tools import gazetteer, quota, weather_tool
+from tools.cache import normalize_key
+
+# Ek-i shohor, user ar model jebhabe lekhe
+VARIANTS = [
+    ["Kolkata", "kolkata", "Calcutta", "Kolkata, IN", "Kolkata, India", "Kolkatta", "কলকাতা"],
+    ["Mumbai", "mumbai", "Bombay", "Mumbai, IN", "Mumbay"],
+    ["Delhi", "New Delhi", "delhi", "Dehli", "Delhi, India", "दिल्ली"],
+    ["Bengaluru", "Bangalore", "Banglore", "bengaluru, in"],
+    ["Chennai", "Madras", "Chenai"],
+    ["Hyderabad", "hyderabad", "Hyderabad, IN"],
+    ["Pune", "pune", "Poona"],
+    ["Siliguri", "siliguri"],
+    ["London", "London, UK", "london"],
+    ["Dhaka", "Dacca", "dhaka, bd"],
+]
+UNKNOWN = ["Xyzzyville", "Hogsmeade", "Narnia", "Mordor", "Wakanda"]
+
+
+def _import_ms(module):
+    # Fresh interpreter-e module-ta (ar tar dependency) import korte koto ms (interpreter startup baad)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    return float("nan")
+
+
+def startup():
+    print(f"import tools.gazetteer: {_import_ms('tools.gazetteer'):.1f} ms")
+    started = time.perf_counter()
+    gazetteer.get_gazetteer()
+    print(f"first open (mmap):      {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+def latency(repeat):
+    index = gazetteer.get_gazetteer()
+    cases = {
+        "exact name": ["Kolkata", "Tokyo", "Siliguri", "Paris"],
+        "alias": ["Calcutta", "Bombay", "Madras", "কলকাতা"],
+        "with country": ["Hyderabad, PK", "Paris, US", "London, UK"],
+        "misspelled": ["Kolkatta", "Banglore", "Dehli", "Chenai"],
+        "unknown": UNKNOWN,
+    }
+    print(f"\n{'lookup':<14} {'p50 us':>8} {'max us':>8}  example")
+    for name, queries in cases.items():
+        timings = []
+        for _ in range(repeat):
+            for query in queries:
+                started = time.perf_counter()
+                index.resolve(query)
+                timings.append((time.perf_counter() - started) * 1e6)
+        city = index.resolve(queries[0])
+        example = f"{queries[0]!r} -> {city.name}, {city.country}" if city else f"{queries[0]!r} -> rejected"
+        print(f"{name:<14} {statistics.median(timings):8.0f} {max(timings):8.0f}  {example}")
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        gazetteer.resolve_city("Kolkata")
+    print(f"{'cached':<14} {(time.perf_counter() - started) / repeat * 1e6:8.1f}")
+
+
+def weather_calls(queries):
+    rng = random.Random(3)
+    # Kichu shohor onek beshi chaoa hoy (Zipf), ar majhe majhe ajana jayga
+    weights = [1 / (rank + 1) for rank in range(len(VARIANTS))]
+    stream = []
+    for _ in range(queries):
+        if rng.random() < 0.03:
+            stream.append(rng.choice(UNKNOWN))
+        else:
+            stream.append(rng.choice(rng.choices(VARIANTS, weights)[0]))
+
+    # Ager bhabe protiti alada normalized string-e (ajana naam soho) ekta upstream call
+    before = len({normalize_key(query) for query in stream})
+
+    hits = {"weather": 0}
+    lock = threading.Lock()
+
+    def weather(handler):
+        with lock:
+            hits["weather"] += 1
+        return 200, {"main": {"temp": 30.0}, "weather": [{"description": "haze"}]}, None
+
+    limits = {name: (100000, 1000000) for name in quota.DEFAULT_LIMITS}
+    quota.scheduler = quota.QuotaScheduler(limits, os.path.join(tempfile.mkdtemp(), "quota.db"))
+    weather_tool._weather_cache.clear()
+    with StubServer({"/weather": weather}) as server:
+        point_tools_at(server.url)
+        answers = [weather_tool.get_weather(query) for query in stream]
+    rejected = sum(answer.startswith("Sorry, I couldn't find") for answer in answers)
+
+    print(f"\n{queries} weather questions, one TTL window")
+    print(f"upstream calls, raw name key (before): {before}")
+    print(f"upstream calls, city id key (after):   {hits['weather']}   ({rejected} unknown places rejected locally)")
+    print(f"weather cache: {weather_tool.weather_cache_stats()}")
+    assert hits["weather"] == len(VARIANTS), "every spelling of a city should share one upstream call"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline city gazetteer benchmark")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    startup()
+    latency(args.repeat)
+    weather_calls(args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_http_client.py
+# Local stub server-er against-e shared pooled client vs bare requests.get:
+# connection reuse-e koto latency bache, ar 503/429 retry thik moto kaaj kore kina.
+#
+# Run from the repo root:  python -m benchmarks.bench_http_client
+
+import argparse
+import time
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from tools import http_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared HTTP client benchmark")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    flaky_calls = {"count": 0}
+
+    def ok(handler):
+        return 200, {"ok": True}, None
+
+    def flaky(handler):
+        # Prothom duto call fail, tarpor success
+        flaky_calls["count"] += 1
+        if flaky_calls["count"] == 1:
+            return 503, {"error": "unavailable"}, None
+        if flaky_calls["count"] == 2:
+            return 429, {"error": "slow down"}, {"Retry-After": "0"}
+        return 200, {"ok": True}, None
+
+    with StubServer({"/ok": ok, "/flaky": flaky}) as server:
+        url = f"{server.url}/ok"
+
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            requests.get(url, timeout=5).raise_for_status()
+        bare = (time.perf_counter() - start) / args.requests
+
+        http_client.get(url)  # warm-up: pool-e connection toiri hoye thakuk
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            http_client.get(url).raise_for_status()
+        pooled = (time.perf_counter() - start) / args.requests
+
+        response = http_client.get(f"{server.url}/flaky", retries=3)
+        retry_ok = response.status_code == 200 and flaky_calls["count"] == 3
+        http_client.close_session()
+
+    print(f"bare requests.get      {bare * 1000:8.3f} ms/request")
+    print(f"pooled http_client.get {pooled * 1000:8.3f} ms/request")
+    print(f"latency saved          {(bare - pooled) * 1000:8.3f} ms/request ({(1 - pooled / bare) * 100:.0f}%)")
+    print(f"retry on 503/429       {'OK' if retry_ok else 'FAILED'}")
+    if not retry_ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_login.py
+# Logins per second: full login (bcrypt verify in check_user) vs returning client
+# jar kache session token ache (get_session_user, ekta indexed query).
+#
+# Run from the repo root:  python -m benchmarks.bench_login
+
+import argparse
+import os
+import tempfile
+import time
+
+import database as db
+
+
+def _per_second(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        assert fn() is not None
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt login vs session token benchmark")
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--token-lookups", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        db.close_all_connections()
+        db.add_user("bench", "bench@example.com", "secret-password")
+        user = db.check_user("bench@example.com", "secret-password")
+        token = db.create_session(user['id'])
+
+        bcrypt_rate = _per_second(lambda: db.check_user("bench@example.com", "secret-password"), args.logins)
+        token_rate = _per_second(lambda: db.get_session_user(token), args.token_lookups)
+
+        db.revoke_session(token)
+        revoked_ok = db.get_session_user(token) is None
+        db.close_all_connections()
+
+    print(f"check_user (bcrypt)        {bcrypt_rate:>10.1f} logins/sec")
+    print(f"get_session_user (token)   {token_rate:>10.1f} logins/sec")
+    print(f"speed-up                   {token_rate / bcrypt_rate:>10.0f}x")
+    print(f"revoked token rejected     {'OK' if revoked_ok else 'FAILED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# benchmarks/bench_math.py
+# solve_math: fast exact evaluator vs SymPy sympify().evalf() per-expression latency,
+# ar module import time (SymPy ekhon lazy import hoy).
+#
+# Run from the repo root:  python -m benchmarks.bench_math
+
+import argparse
+import time
+
+from benchmarks.bench_startup import import_time_ms
+from tools import math_tool
+
+EXPRESSIONS = ["2+2", "100 / 4", "(15.5 * 3) - 7 / 2", "2**10 + 3**4", "((1+2)*(3+4))/(5-6)"]
+
+
+def _per_call_us(fn, expression, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(expression)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Math tool latency and import-time benchmark")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"import tools.math_tool : {import_time_ms('import tools.math_tool'):8.1f} ms")
+    print(f"import sympy           : {import_time_ms('import sympy'):8.1f} ms")
+    print()
+
+    import sympy
+
+    def sympy_path(expression):
+        return str(sympy.sympify(expression).evalf())
+
+    print(f"{'expression':<24} {'fast (us)':>10} {'sympy (us)':>11}")
+    for expression in EXPRESSIONS:
+        fast = _per_call_us(math_tool.evaluate_expression, expression, args.repeat)
+        slow = _per_call_us(sympy_path, expression, max(1, args.repeat // 10))
+        print(f"{expression:<24} {fast:>10.1f} {slow:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
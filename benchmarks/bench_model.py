@@ -0,0 +1,92 @@
+# benchmarks/bench_model.py
+# Per-session model (ager: protiti session-e genai.configure + GenerativeModel) bonam
+# process-wide shared model (ekhon: ekbar build_model, session-e shudhu start_chat).
+# Asol SDK diye, network chara: session-prothi memory (tracemalloc) ar prothom turn-e
+# model/client toiri korar latency mapa hoy. Client-er gRPC channel connect kore
+# prothom RPC-te, tai kono request pathano hoy na.
+#
+# Run from the repo root:  python -m benchmarks.bench_model --sessions 200
+
+import argparse
+import statistics
+import time
+import tracemalloc
+import warnings
+
+from main_agent import build_model
+from tools.registry import TOOLS
+
+FAKE_API_KEY = "AIza" + "x" * 35
+SYSTEM_INSTRUCTION = "You are YES Ai, a helpful AI assistant. " * 40
+
+
+def _first_turn_client(model):
+    # send_message() prothom bar ei client-ta ney (GenerativeModel-er lazy _client)
+    from google.generativeai import client
+    return client.get_default_generative_client()
+
+
+def per_session(sessions):
+    """Old path: every session configures the SDK and builds its own model."""
+    kept, timings = [], []
+    for _ in range(sessions):
+        started = time.perf_counter()
+        model = build_model(FAKE_API_KEY, TOOLS, SYSTEM_INSTRUCTION, context_cache=False)
+        chat = model.start_chat()
+        kept.append((model, chat, _first_turn_client(model)))
+        timings.append((time.perf_counter() - started) * 1000)
+    return kept, timings
+
+
+def shared(sessions):
+    """New path: one model per process, each session only starts a ChatSession."""
+    model = build_model(FAKE_API_KEY, TOOLS, SYSTEM_INSTRUCTION, context_cache=False)
+    kept, timings = [], []
+    for _ in range(sessions):
+        started = time.perf_counter()
+        chat = model.start_chat()
+        kept.append((model, chat, _first_turn_client(model)))
+        timings.append((time.perf_counter() - started) * 1000)
+    return kept, timings
+
+
+def measure(function, sessions):
+    function(5)  # lazy import ar SDK-r prothom-barer setup baad
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept, timings = function(sessions)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    clients = len({id(client) for _, _, client in kept})
+    return used / sessions / 1024, statistics.median(timings), max(timings), clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared vs per-session Gemini model benchmark")
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")  # google.generativeai-er deprecation warning
+
+    try:
+        import google.generativeai  # noqa: F401
+    except ImportError:
+        print("google-generativeai is not installed; nothing to measure")
+        return
+
+    print(f"{args.sessions} sessions, first turn of each")
+    print(f"{'mode':<22} {'KiB/session':>12} {'p50 ms':>8} {'max ms':>8} {'clients':>8}")
+    results = {}
+    for name, function in (("per-session (before)", per_session), ("shared (after)", shared)):
+        results[name] = measure(function, args.sessions)
+        kib, p50, worst, clients = results[name]
+        print(f"{name:<22} {kib:12.1f} {p50:8.2f} {worst:8.2f} {clients:8}")
+
+    before, after = results["per-session (before)"], results["shared (after)"]
+    assert after[3] == 1, f"shared model should use one client, used {after[3]}"
+    assert after[0] < before[0], "shared model should use less memory per session"
+    print(f"\nmemory per session: {before[0] / max(after[0], 0.1):.0f}x less, "
+          f"first-turn setup p50: {before[1] - after[1]:.2f} ms saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# benchmarks/bench_quota.py
+# Quota scheduler, fake clock diye (real wait chara): per-minute token bucket,
+# restart-er por-o thaka daily counter, interactive-age-research priority, Retry-After
+# backoff, 5xx/connection error retry (protiti attempt quota-y gona), quota prai shesh
+# hole cached weather/news, ar user-er deep_research-er shesh quota pawa.
+#
+# Run from the repo root:  python -m benchmarks.bench_quota
+
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.fakes import FakeClock, point_tools_at
+from benchmarks.stub_server import StubServer
+from tools import news_tool, quota, research_cache, research_tool, weather_tool
+from tools.cache import TTLCache
+
+
+def check(label, condition):
+    print(f"  [{'ok' if condition else 'FAIL'}] {label}")
+    assert condition, label
+
+
+def bucket_pacing(db_path):
+    print("per-minute token bucket")
+    clock = FakeClock()
+    scheduler = quota.QuotaScheduler({"gnews": (30, 1000)}, db_path, clock)
+    stamps = []
+    for _ in range(300):
+        scheduler.acquire("gnews", max_wait=120)
+        stamps.append(clock.monotonic())
+    elapsed = stamps[-1] - stamps[0]
+    # Jekono 60 second window-e koto gulo call holo (sliding)
+    busiest = max(sum(1 for t in stamps[i:] if t < start + 60) for i, start in enumerate(stamps))
+    check(f"no 60 s window has more than 30 calls (busiest: {busiest})", busiest <= 30)
+    rate = (len(stamps) - 1) / elapsed * 60
+    check(f"sustained rate {rate:.1f}/min stays close to the 30/min limit", rate >= 30 * 0.85)
+    print(f"  fake time slept: {clock.slept:.0f}s, used today: {scheduler.used_today('gnews')}")
+
+
+def daily_limit(db_path):
+    print("persistent daily counter")
+    clock = FakeClock(start=1_700_000_000.0)
+    limits = {"serpapi": (1000, 5)}
+    scheduler = quota.QuotaScheduler(limits, db_path, clock)
+    for _ in range(3):
+        scheduler.acquire("serpapi")
+    # Restart: notun scheduler, ek-i SQLite file
+    restarted = quota.QuotaScheduler(limits, db_path, clock)
+    check("counter survives a restart", restarted.used_today("serpapi") == 3)
+    restarted.acquire("serpapi")
+    restarted.acquire("serpapi")
+    try:
+        restarted.acquire("serpapi")
+        exhausted = False
+    except quota.QuotaExceeded as e:
+        exhausted = e.reason == "exhausted for today"
+    check("6th call of a 5/day quota is refused", exhausted)
+    check("research calls are refused past the low watermark",
+          _raises(lambda: restarted.acquire("serpapi", quota.RESEARCH)))
+    clock.advance(86400)
+    restarted.acquire("serpapi")
+    check("quota resets on the next UTC day", restarted.used_today("serpapi") == 1)
+
+
+def _raises(function):
+    try:
+        function()
+    except quota.QuotaExceeded:
+        return True
+    return False
+
+
+def priority_order(db_path):
+    print("priority queue")
+    clock = FakeClock(auto_advance=False)
+    scheduler = quota.QuotaScheduler({"gnews": (4, 1000)}, db_path, clock)
+    scheduler.acquire("gnews")  # burst (1 token) shesh
+    order = []
+
+    def research():
+        scheduler.acquire("gnews", quota.RESEARCH, max_wait=600)
+        order.append("research")
+
+    def interactive():
+        scheduler.acquire("gnews", quota.INTERACTIVE, max_wait=600)
+        order.append("interactive")
+
+    # Research aage queue-te dhoke, interactive pore
+    threads = [threading.Thread(target=research), threading.Thread(target=interactive)]
+    waiters = scheduler._providers["gnews"].waiters
+    threads[0].start()
+    while len(waiters) < 1:
+        time.sleep(0.001)
+    threads[1].start()
+    while len(waiters) < 2:
+        time.sleep(0.001)
+    # Duijon-i wait korche; ebar time chalai, ek-ek kore token ashe
+    while any(thread.is_alive() for thread in threads):
+        clock.advance(1)
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+    check(f"interactive call served before an earlier research call: {order}", order == ["interactive", "research"])
+
+
+def retry_after_and_degrade(db_path):
+    print("Retry-After backoff and degrading to cache")
+    clock = FakeClock()
+    scheduler = quota.QuotaScheduler(
+        {"openweather": (600, 10), "gnews": (600, 10), "serpapi": (600, 10)}, db_path, clock)
+    quota.scheduler = scheduler
+    state = {"limited": False, "weather_hits": 0, "news_hits": 0, "search_hits": 0, "news_errors": 0}
+
+    def weather(handler):
+        state["weather_hits"] += 1
+        if state["limited"]:
+            return 429, {"message": "rate limited"}, {"Retry-After": "120"}
+        return 200, {"main": {"temp": 30.0}, "weather": [{"description": "clear sky"}]}, None
+
+    def gnews(handler):
+        state["news_hits"] += 1
+        if state["news_errors"]:
+            state["news_errors"] -= 1
+            return 502, {"errors": ["bad gateway"]}, None
+        return 200, {"totalArticles": 1, "articles": [{"title": "Monsoon arrives", "source": {"name": "Fake"}}]}, None
+
+    def serpapi(handler):
+        state["search_hits"] += 1
+        return 200, {"organic_results": [{"title": "Chandrayaan-3", "snippet": "Landed near the south pole."}]}, None
+
+    with StubServer({"/weather": weather, "/gnews": gnews, "/serpapi": serpapi}) as server:
+        point_tools_at(server.url)
+        # Tool cache-gulo-o fake clock-e, jate TTL paar korte real wait na lage
+        weather_tool._weather_cache = TTLCache(
+            weather_tool.WEATHER_CACHE_TTL, stale_ttl=weather_tool.WEATHER_CACHE_STALE, clock=clock.monotonic)
+        news_tool._news_cache = TTLCache(
+            news_tool.NEWS_CACHE_TTL, stale_ttl=news_tool.NEWS_CACHE_STALE, clock=clock.monotonic)
+
+        check("first weather call goes upstream", "clear sky" in weather_tool.get_weather("Delhi"))
+        # Cache TTL paar, ar upstream ekhon 429 + Retry-After dey
+        weather_tool._weather_cache.clear()
+        state["limited"] = True
+        answer = weather_tool.get_weather("Pune")
+        check(f"429 with no cached value gives a friendly message: {answer!r}", "try again" in answer)
+        check("provider is backing off for Retry-After", scheduler.stats()["openweather"]["blocked_for"] > 100)
+
+        state["limited"] = False
+        clock.advance(130)
+        weather_tool.get_weather("Kolkata")  # cache-e boshlo
+        clock.advance(weather_tool.WEATHER_CACHE_TTL + 60)  # ekhon stale
+        while scheduler.used_today("openweather") < 9:
+            scheduler.acquire("openweather")  # 10-er moddhe 9 ta shesh
+        hits_before = state["weather_hits"]
+        answer = weather_tool.get_weather("Kolkata")
+        check(f"past the watermark a stale reading is served: {answer!r}", "cached" in answer)
+        check("no upstream call was made for it", state["weather_hits"] == hits_before)
+
+        # Ekta 502 holeo news ashe, ar retry-o quota-y gona hoy
+        used_before = scheduler.used_today("gnews")
+        state["news_errors"] = 1
+        answer = news_tool.get_latest_news("monsoon")
+        check(f"a transient 502 is retried: {answer[:40]!r}", "Monsoon arrives" in answer)
+        check("both attempts count against the quota", scheduler.used_today("gnews") == used_before + 2)
+        used_before = scheduler.used_today("gnews")
+        try:
+            scheduler.request("gnews", "http://127.0.0.1:9/closed")
+            refused = False
+        except requests.ConnectionError:
+            refused = True
+        check("connection errors are retried, then raised", refused)
+        check(f"each attempt took a slot ({quota.QUOTA_MAX_RETRIES + 1})",
+              scheduler.used_today("gnews") == used_before + quota.QUOTA_MAX_RETRIES + 1)
+
+        clock.advance(news_tool.NEWS_CACHE_TTL + 60)
+        while scheduler.used_today("gnews") < 9:
+            scheduler.acquire("gnews")
+        hits_before = state["news_hits"]
+        answer = news_tool.get_latest_news("monsoon")
+        check("news falls back to expired headlines near the limit", "Monsoon arrives" in answer)
+        check("without spending the last calls", state["news_hits"] == hits_before)
+
+        # deep_research research priority-te queue-te daray, kintu user-er prompt theke ashe:
+        # cache-e kichu na thakle reserve-o khoroch kore
+        while scheduler.used_today("serpapi") < 9:
+            scheduler.acquire("serpapi")
+        research_cache.RESEARCH_CACHE_DB = os.path.join(os.path.dirname(db_path), "research_cache.db")
+        answer = research_tool.deep_research("Chandrayaan-3")
+        check(f"a user's deep research can use the last calls: {answer[:40]!r}", "south pole" in answer)
+        check("and it went upstream", state["search_hits"] == 1)
+    print(f"  stats: {scheduler.stats()}")
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="yesai-quota-")
+    weather_tool.API_KEY = news_tool.API_KEY = research_tool.API_KEY = "fake"
+    bucket_pacing(os.path.join(tmp, "pacing.db"))
+    daily_limit(os.path.join(tmp, "daily.db"))
+    priority_order(os.path.join(tmp, "priority.db"))
+    retry_after_and_degrade(os.path.join(tmp, "degrade.db"))
+    print("\nall quota checks passed")
+
+
+if __name__ == "__main__":
+    main()
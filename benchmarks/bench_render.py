@@ -0,0 +1,170 @@
+# benchmarks/bench_render.py
+# Chat page render cost boro history-te. Duto bhag:
+#   1. Purono message render: ager bhabe (avatar file path, raw st.markdown) bonam
+#      ekhon (static avatar URL, content-hash-e cached markdown).
+#   2. Puro app: full page rerun bonam ekta chat turn, jekhane shudhu chat fragment
+#      rerun hoy (sidebar ar history abar render hoy na).
+# Shudhu script execution time mapa hoy (AppTest-er element tree parse baad), fake model diye.
+#
+# Run from the repo root:  python -m benchmarks.bench_render --messages 100 1000 3000
+
+import argparse
+import functools
+import os
+import random
+import statistics
+import tempfile
+import time
+import warnings
+
+from streamlit.runtime.scriptrunner import script_runner
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+import database as db
+import main_agent
+import render_cache
+from benchmarks.fakes import FakeGenerativeModel
+
+_script_times = []
+_run_script = script_runner.ScriptRunner._run_script
+
+
+def _timed_run_script(self, *args, **kwargs):
+    started = time.perf_counter()
+    try:
+        return _run_script(self, *args, **kwargs)
+    finally:
+        _script_times.append((time.perf_counter() - started) * 1000)
+
+
+script_runner.ScriptRunner._run_script = _timed_run_script
+
+
+def fake_history(count, seed=7):
+    """Alternating user prompts and markdown answers of realistic length."""
+    rng = random.Random(seed)
+    topics = ["weather in Kolkata", "ISRO launch", "biryani recipe", "stock market", "Durga Puja travel"]
+    messages = []
+    for i in range(count):
+        topic = rng.choice(topics)
+        if i % 2 == 0:
+            messages.append({"role": "user", "content": f"Tell me about {topic} ({i})"})
+            continue
+        points = "\n".join(
+            f"- **Point {n}:** {topic} detail costs about ${rng.randint(5, 500)} and takes {n} days."
+            for n in range(rng.randint(3, 10))
+        )
+        messages.append({"role": "assistant", "content": f"### {topic.title()}\n\n{points}\n\nHope this helps! ({i})"})
+    return messages
+
+
+def _history_before(messages):
+    import streamlit as st
+
+    for message in messages:
+        avatar = "static/yes_ai_avatar.png" if message["role"] == "assistant" else None
+        with st.chat_message(message["role"], avatar=avatar):
+            st.markdown(message["content"])
+
+
+def _history_after(messages):
+    import streamlit as st
+
+    import render_cache
+
+    for message in messages:
+        avatar = "/app/static/yes_ai_avatar.png" if message["role"] == "assistant" else None
+        with st.chat_message(message["role"], avatar=avatar):
+            st.markdown(render_cache.markdown_body(message["content"]))
+
+
+def _median_script_ms(run, repeat):
+    run()  # warm up (render cache, import)
+    times = []
+    for _ in range(repeat):
+        _script_times.clear()
+        run()
+        times.append(sum(_script_times))
+    return statistics.median(times)
+
+
+def history_render(counts, repeat):
+    print(f"{'history':>8} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for count in counts:
+        messages = fake_history(count)
+        results = []
+        for script in (_history_before, _history_after):
+            at = AppTest.from_function(script, args=(messages,), default_timeout=600)
+            results.append(_median_script_ms(at.run, repeat))
+        before, after = results
+        print(f"{count:8} {before:10.1f} {after:10.1f} {before / after:7.1f}x")
+
+
+def _login(tmp):
+    db.DATABASE_NAME = os.path.join(tmp, "users.db")
+    at = AppTest.from_file("../app.py", default_timeout=600)
+    at.secrets["GEMINI_API_KEY"] = "fake"
+    at.run()
+    at.text_input[0].input("yesai.dev@gmail.com")
+    at.text_input[1].input("aidemo123")
+    at.button[0].click()
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+
+def _fragment_turn(at, prompt):
+    # AppTest shob shomoy puro script chalay; browser-er moto shudhu chat fragment chalate
+    # rerun request-e fragment id deoa hoy
+    (fragment_id,) = at._fragment_storage._fragments
+    at.chat_input[0].set_value(prompt)
+    local_script_runner.RerunData = functools.partial(RerunData, fragment_id_queue=[fragment_id])
+    try:
+        at.run()
+    finally:
+        local_script_runner.RerunData = RerunData
+
+
+def app_turns(counts, repeat):
+    fake_model = FakeGenerativeModel(first_token_delay=0, chunk_delay=0, chunks=5)
+    main_agent.build_model = lambda *args, **kwargs: fake_model
+    tmp = tempfile.mkdtemp(prefix="yesai-render-")
+    at = _login(tmp)
+
+    print(f"\n{'history':>8} {'full rerun ms':>14} {'chat turn ms':>13}")
+    for count in counts:
+        def full_rerun():
+            at.session_state.messages = fake_history(count)
+            at.session_state.history_cursor = None
+            at.run()
+
+        def chat_turn():
+            full_rerun()
+            _script_times.clear()
+            _fragment_turn(at, "what is the weather in Delhi?")
+            assert at.session_state.messages[-1]["role"] == "assistant"
+            assert len(at.session_state.messages) == count + 2
+            return sum(_script_times)
+
+        full = _median_script_ms(full_rerun, repeat)
+        chat_turn()
+        turn = statistics.median(chat_turn() for _ in range(repeat))
+        print(f"{count:8} {full:14.1f} {turn:13.1f}")
+    assert not at.exception, at.exception
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat page render benchmark")
+    parser.add_argument("--messages", type=int, nargs="+", default=[100, 1000, 3000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    history_render(args.messages, args.repeat)
+    app_turns(args.messages, args.repeat)
+    print(f"\nrender cache: {render_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
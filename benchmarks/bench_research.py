@@ -0,0 +1,111 @@
+# benchmarks/bench_research.py
+# Deep research pipeline, local fixture server-er against-e: page-gulo ek-i shathe
+# fetch (ekta slow, ekta bishal, ekta 404, ekta PDF shoho) vs ek-ek kore puro page
+# download, ar model-ke koto token jay (puro page text vs top BM25 passage).
+#
+# Run from the repo root:  python -m benchmarks.bench_research
+
+import argparse
+import re
+import time
+
+import requests
+
+from benchmarks.fakes import fake_article
+from benchmarks.stub_server import StubServer
+from tools import research_pipeline
+
+QUERY = "Chandrayaan-3 landing site near the lunar south pole"
+# Ei fact-ta model porjonto pouchachhe kina dekhi
+FACT = "Shiv Shakti point"
+
+FILLER = [
+    "The mission team published regular updates for the public during the mission.",
+    "Many schools organised live viewing sessions and discussions in classrooms.",
+    "Engineers reviewed telemetry from the spacecraft every few hours.",
+    "The space agency thanked its industrial partners for their contributions.",
+]
+
+
+def _article(title, facts, repeat=40):
+    paragraphs = [FILLER[i % len(FILLER)] for i in range(repeat)]
+    for offset, fact in enumerate(facts):
+        paragraphs.insert((offset + 1) * repeat // (len(facts) + 1), fact)
+    return fake_article(title, paragraphs)
+
+
+def _routes(slow_seconds, big_bytes):
+    pages = {
+        "/moon": _article("Chandrayaan-3 mission", [
+            "Chandrayaan-3 Vikram lander touched down near the lunar south pole on 23 August 2023.",
+            f"The landing site was later named the {FACT}, about 600 km from the south pole.",
+        ]),
+        "/rover": _article("Pragyan rover", [
+            "The Pragyan rover confirmed sulphur in the lunar soil near the south pole landing site.",
+        ]),
+        "/history": _article("History of lunar missions", [
+            "Earlier lunar missions landed near the equator, far from the south pole.",
+        ]),
+        "/big": _article("Space news archive", ["Lunar landing coverage archive."], repeat=big_bytes // 80),
+    }
+
+    def page(handler):
+        return 200, pages[handler.path], None
+
+    def slow(handler):
+        time.sleep(slow_seconds)
+        return 200, _article("Slow site", ["Chandrayaan-3 landing site south pole"]), None
+
+    def pdf(handler):
+        return 200, b"%PDF-1.4 binary", {"Content-Type": "application/pdf"}
+
+    routes = {path: page for path in pages}
+    routes.update({"/slow": slow, "/pdf": pdf})
+    return routes
+
+
+def _naive_fetch(urls):
+    # Ek-ek kore puro page download, regex diye tag strip, shob text model-e
+    texts = []
+    for url in urls:
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException:
+            continue
+        texts.append(re.sub(r"<[^>]+>", " ", response.text))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deep research pipeline benchmark")
+    parser.add_argument("--slow", type=float, default=6.0, help="delay of the slow fixture page (s)")
+    parser.add_argument("--big-bytes", type=int, default=3_000_000, help="size of the oversized page")
+    args = parser.parse_args()
+
+    with StubServer(_routes(args.slow, args.big_bytes)) as server:
+        paths = ["/moon", "/rover", "/history", "/big", "/slow", "/missing", "/pdf"]
+        urls = [f"{server.url}{path}" for path in paths]
+        results = [{"title": path.strip("/"), "link": url, "snippet": ""} for path, url in zip(paths, urls)]
+
+        start = time.perf_counter()
+        naive = _naive_fetch(urls)
+        naive_time = time.perf_counter() - start
+        naive_tokens = sum(len(text) // 4 for text in naive)
+
+        start = time.perf_counter()
+        passages = research_pipeline.research_passages(QUERY, results, max_pages=len(urls))
+        pipeline_time = time.perf_counter() - start
+        pipeline_tokens = sum(len(p["text"]) // 4 for p in passages)
+
+    print(f"{'':<22} {'seconds':>8} {'tokens':>10}")
+    print(f"{'sequential full pages':<22} {naive_time:>8.2f} {naive_tokens:>10}")
+    print(f"{'pipeline top passages':<22} {pipeline_time:>8.2f} {pipeline_tokens:>10}")
+    print(f"\n{len(passages)} passages (budget {research_pipeline.RESEARCH_TOKEN_BUDGET} tokens):")
+    for passage in passages:
+        print(f"  {passage['score']:>6}  {passage['url'].rsplit('/', 1)[-1]:<8} {passage['text'][:90]}...")
+    print(f"\nkey fact among the passages: {any(FACT in p['text'] for p in passages)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_response_cache.py
+# Answer cache (response_cache.py):
+#   1. kon prompt personal dhora hoy - shared prompt ("main causes of inflation",
+#      "latest US news") cache-e jaoa uchit, personal ("tell us", "mera") na,
+#   2. onek user-er first-turn prompt-er ek stream-e koto Gemini turn lage ar
+#      cache hit bonam miss-er latency (fake model).
+#
+# Run from the repo root:  python -m benchmarks.bench_response_cache --turns 200
+
+import argparse
+import random
+import statistics
+import time
+
+import main_agent
+import response_cache
+from benchmarks.fakes import FakeGenerativeModel
+
+SHARED = [
+    "main causes of inflation",
+    "US election news",
+    "latest US news",
+    "What is the capital of Australia?",
+    "Main street businesses in India",
+    "Explain photosynthesis simply",
+]
+PERSONAL = [
+    "tell us a joke",
+    "Us too, what should we cook?",
+    "what is my horoscope",
+    "Main kya karun aaj?",
+    "mera naam yaad hai?",
+    "amar jonno ekta gaan",
+]
+
+
+def classification():
+    print(f"{'prompt':<34} personal")
+    for prompt in SHARED + PERSONAL:
+        print(f"{prompt:<34} {response_cache.is_personal(prompt)}")
+    wrong = [p for p in SHARED if response_cache.is_personal(p)]
+    wrong += [p for p in PERSONAL if not response_cache.is_personal(p)]
+    assert not wrong, f"misclassified: {wrong}"
+
+
+def turns(count, first_token_delay):
+    model_turns = {"count": 0}
+
+    def answer(text):
+        model_turns["count"] += 1
+        return ("Here is a detailed answer about " + text + ". ") * 5
+
+    model = FakeGenerativeModel(first_token_delay=first_token_delay, chunk_delay=0.0, answer=answer)
+    response_cache.RESPONSE_CACHE_ENABLED = True
+    rng = random.Random(5)
+    timings = {"hit": [], "miss": []}
+    prompts = [rng.choice(SHARED + PERSONAL) for _ in range(count)]
+    for prompt in prompts:
+        before = model_turns["count"]
+        started = time.perf_counter()
+        "".join(main_agent.stream_cached_turn(model.start_chat(), prompt, []))
+        elapsed = (time.perf_counter() - started) * 1000
+        timings["miss" if model_turns["count"] > before else "hit"].append(elapsed)
+
+    print(f"\n{count} first-turn prompts, {len(SHARED)} shared + {len(PERSONAL)} personal")
+    print(f"Gemini turns without cache: {count}")
+    print(f"Gemini turns with cache:    {model_turns['count']}   (stats {response_cache.stats()})")
+    for kind, values in timings.items():
+        if values:
+            print(f"{kind:<5} p50 {statistics.median(values):8.2f} ms  ({len(values)} turns)")
+    # Protiti shared prompt ekbar-i model-e jay, personal-gulo protibar
+    expected = len(set(prompts) & set(SHARED)) + sum(prompt in PERSONAL for prompt in prompts)
+    assert model_turns["count"] == expected, f"{model_turns['count']} Gemini turns, expected {expected}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer cache benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--first-token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    classification()
+    turns(args.turns, args.first_token_delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_search.py
+# Chat history search: FTS5 index (search_history) vs purano "LIKE '%word%'" scan.
+# Onek user-er boro history toiri kore ekjon heavy user-er upor query chalay.
+#
+# Run from the repo root:  python -m benchmarks.bench_search --messages 200000
+
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+import database as db
+
+TOPICS = (
+    "weather kolkata rain news cricket isro rocket math equation python code recipe "
+    "biryani travel delhi mumbai train football movie music exam physics chemistry "
+    "history election market stock price festival durga puja monsoon river"
+).split()
+# Shadharon lekha-r moto: kichu word khub common, beshirbhag rare (Zipf)
+FILLER = [f"w{i}" for i in range(20000)]
+FILLER_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(FILLER))))
+# Khub kom message-e thake emon word (LIKE-er worst case: puro history scan)
+RARE = ["chandrayaan", "rabindranath"]
+QUERIES = ["kolkata", "isro rocket", "monsoon riv", "chandrayaan", "rabindranath sangeet", "xylophone"]
+
+
+def _populate(user_id, messages, other_users):
+    rng = random.Random(42)
+    rows = []
+    for i in range(messages):
+        owner = user_id if i % (other_users + 1) == 0 else rng.randint(2, other_users + 1)
+        words = rng.choices(FILLER, cum_weights=FILLER_WEIGHTS, k=rng.randint(8, 40))
+        words += rng.sample(TOPICS, rng.randint(0, 2))
+        if rng.random() < 0.0005:
+            words += RARE + ["sangeet"]
+        rng.shuffle(words)
+        text = " ".join(words)
+        rows.append((owner, "user" if i % 2 == 0 else "assistant", text, datetime.now()))
+    with db.get_db_connection() as conn, conn:
+        conn.executemany(
+            "INSERT INTO chat_history (user_id, role, content, timestamp) VALUES (?, ?, ?, ?)", rows
+        )
+
+
+def like_search(user_id, query, limit=db.SEARCH_PAGE_SIZE):
+    # Ager bhabe: protiti word-er jonno LIKE, user-er puro history scan hoy
+    terms = query.split()
+    where = " AND ".join("content LIKE ?" for _ in terms)
+    with db.get_db_connection() as conn:
+        return conn.execute(
+            f"SELECT id, role, content, timestamp FROM chat_history WHERE user_id = ? AND {where} "
+            "ORDER BY id DESC LIMIT ?", (user_id, *[f"%{t}%" for t in terms], limit)
+        ).fetchall()
+
+
+def _ms_per_query(fn, query, repeat):
+    fn(1, query)  # warm up page cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(1, query)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200_000, help="messages of the searched user")
+    parser.add_argument("--other-users", type=int, default=1, help="other users' messages per searched message")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db.DATABASE_NAME = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+    db.close_all_connections()
+    total = args.messages * (args.other_users + 1)
+    print(f"inserting {total} messages ({args.messages} for the searched user)...")
+    start = time.perf_counter()
+    _populate(1, total, args.other_users)
+    print(f"insert incl. FTS triggers: {time.perf_counter() - start:.1f}s")
+
+    print(f"{'query':<22} {'LIKE ms':>9} {'FTS5 ms':>9} {'hits':>6}")
+    for query in QUERIES:
+        like = _ms_per_query(like_search, query, args.repeat)
+        fts = _ms_per_query(lambda user_id, q: db.search_history(user_id, q), query, args.repeat)
+        hits = len(db.search_history(1, query)[0])
+        print(f"{query:<22} {like:>9.2f} {fts:>9.2f} {hits:>6}")
+    print("LIKE returns newest matches unranked and stops early on common words; "
+          "FTS5 ranks every match (BM25) and never scans the whole history.")
+    db.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
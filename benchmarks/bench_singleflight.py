@@ -0,0 +1,92 @@
+# benchmarks/bench_singleflight.py
+# Onek session ek-i shathe ek-i tool call korle (cricket news, Mumbai weather):
+# slow stub upstream koto bar hit hoy - direct tool call vs registry (single-flight).
+#
+# Run from the repo root:  python -m benchmarks.bench_singleflight --callers 50
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.stub_server import StubServer
+from benchmarks.fakes import point_tools_at
+from tools import news_tool, quota, registry, weather_tool
+from tools.singleflight import tool_calls
+
+# Ek-i query, user-ra bibhinno bhabe lekhe
+SPELLINGS = {
+    "news": ["cricket", "Cricket", " cricket ", "CRICKET"],
+    "weather": ["Mumbai", "mumbai", "  Mumbai", "MUMBAI"],
+}
+
+
+def _hammer(function, spellings, callers):
+    barrier = threading.Barrier(callers)
+    results = []
+
+    def caller(index):
+        barrier.wait()  # shobai ek-i muhurte
+        results.append(function(spellings[index % len(spellings)]))
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-flight tool call coalescing")
+    parser.add_argument("--callers", type=int, default=50, help="concurrent identical calls")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub upstream latency (s)")
+    args = parser.parse_args()
+
+    hits = {"/weather": 0, "/gnews": 0}
+    hits_lock = threading.Lock()
+
+    def upstream(path, body):
+        def handler(request):
+            with hits_lock:
+                hits[path] += 1
+            time.sleep(args.latency)
+            return 200, body, None
+        return handler
+
+    routes = {
+        "/weather": upstream("/weather", {"main": {"temp": 29.0}, "weather": [{"description": "heavy rain"}]}),
+        "/gnews": upstream("/gnews", {"totalArticles": 1, "articles": [
+            {"title": "India win the final", "source": {"name": "Fake Sports"}}]}),
+    }
+
+    # Quota ekhane measure hocche na: boro limit, temp counter file
+    limits = {name: (100000, 1000000) for name in quota.DEFAULT_LIMITS}
+    quota.scheduler = quota.QuotaScheduler(limits, os.path.join(tempfile.mkdtemp(), "quota.db"))
+
+    with StubServer(routes) as server:
+        point_tools_at(server.url)
+        cases = [
+            ("news", news_tool.get_latest_news, registry.get_latest_news, "/gnews"),
+            ("weather", weather_tool.get_weather, registry.get_weather, "/weather"),
+        ]
+        print(f"{args.callers} concurrent callers, upstream latency {args.latency}s\n")
+        print(f"{'tool':<8} {'mode':<14} {'upstream hits':>14} {'seconds':>8}")
+        for label, direct, coalesced, path in cases:
+            for mode, function in (("direct", direct), ("single-flight", coalesced)):
+                weather_tool._weather_cache.clear()  # cache na, shudhu coalescing measure
+                news_tool._news_cache.clear()
+                hits[path] = 0
+                results, elapsed = _hammer(function, SPELLINGS[label], args.callers)
+                errors = [r for r in results if "error" in r.lower()]
+                print(f"{label:<8} {mode:<14} {hits[path]:>14} {elapsed:>8.2f}"
+                      + (f"   ({len(errors)} errors)" if errors else ""))
+            assert hits[path] == 1, f"{label}: expected 1 upstream call with single-flight, got {hits[path]}"
+
+    print(f"\ncounters: {tool_calls.stats()}")
+
+
+if __name__ == "__main__":
+    main()
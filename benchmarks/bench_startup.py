@@ -0,0 +1,57 @@
+# benchmarks/bench_startup.py
+# Cold-start import cost: login page render korar age app.py ja ja import kore,
+# ager eager import-gulor shathe tulona (python -X importtime diye).
+#
+# Run from the repo root:  python -m benchmarks.bench_startup
+
+import argparse
+import subprocess
+import sys
+
+# Login page dekhano porjonto app.py-r top-level import (streamlit chara)
+LOGIN_PAGE_IMPORTS = "import database, tools.email_tool, tools.registry, main_agent"
+# Ager app.py top-e egulo sob import korto. serpapi (google-search-results) ar
+# requirements-e nei, tai baseline-e bad; before-er shotti cost er cheye ektu beshi chilo
+EAGER_IMPORTS = (
+    "import google.generativeai, bcrypt, requests, sympy, dotenv, "
+    "database, tools.email_tool, main_agent"
+)
+
+
+def import_time_ms(statement):
+    """Total cumulative import time (ms) of top-level imports in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"; top-level module-er indent nei
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit() and not parts[2].startswith("  "):
+            total += int(parts[1])
+    return total / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = [("login page (lazy)", LOGIN_PAGE_IMPORTS), ("streamlit itself", "import streamlit")]
+    try:
+        import_time_ms(EAGER_IMPORTS)
+        rows.insert(0, ("eager imports (before)", EAGER_IMPORTS))
+    except RuntimeError as e:
+        print(f"skipping eager baseline: {e}")
+
+    for name, statement in rows:
+        # Prothom run disk cache garam kore, tai best-of-N report kori
+        best = min(import_time_ms(statement) for _ in range(args.runs))
+        print(f"{name:<24} {best:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_streaming.py
+# Fake streaming model diye time-to-first-token measure kora:
+# streaming turn vs puro answer-er jonno wait kora (ager behaviour).
+#
+# Run from the repo root:  python -m benchmarks.bench_streaming
+
+import argparse
+import time
+
+from benchmarks.fakes import FakeGenerativeModel
+from main_agent import run_agent_turn, stream_agent_turn
+
+
+def fake_weather(city: str) -> str:
+    return f"The current weather in {city} is 31°C with haze."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming time-to-first-token benchmark")
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--with-tool", action="store_true", help="make the model call a tool first")
+    args = parser.parse_args()
+
+    tool_plan = (lambda prompt: [("fake_weather", {"city": "Kolkata"})]) if args.with_tool else None
+    model = FakeGenerativeModel(
+        first_token_delay=args.first_token_delay, chunk_delay=args.chunk_delay,
+        chunks=args.chunks, tool_plan=tool_plan,
+    )
+    prompt = "What's the weather in Kolkata?"
+
+    start = time.perf_counter()
+    text = run_agent_turn(model.start_chat(), prompt, [fake_weather])
+    blocking_total = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_token = None
+    streamed = []
+    for chunk in stream_agent_turn(model.start_chat(), prompt, [fake_weather]):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        streamed.append(chunk)
+    streaming_total = time.perf_counter() - start
+
+    assert "".join(streamed) == text, "streamed text must equal the blocking answer"
+    print(f"blocking  : first text after {blocking_total * 1000:7.1f} ms (= total)")
+    print(f"streaming : first text after {first_token * 1000:7.1f} ms, total {streaming_total * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_tool_dispatch.py
+# Ek model turn-e onek tool call: sequential (sum of latencies) vs
+# dispatch_tool_calls (concurrent, ~max of latencies). Stub tool-gulo shudhu sleep kore.
+#
+# Run from the repo root:  python -m benchmarks.bench_tool_dispatch
+
+import argparse
+import time
+
+from benchmarks.fakes import FakeGenerativeModel
+import main_agent
+
+
+def make_stub(name, delay):
+    def stub(city: str) -> str:
+        time.sleep(delay)
+        return f"{name}: weather in {city} is fine"
+    stub.__name__ = name
+    return stub
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel tool dispatch benchmark")
+    parser.add_argument("--delays", default="0.2,0.4,0.6", help="comma-separated tool latencies (s)")
+    args = parser.parse_args()
+
+    delays = [float(value) for value in args.delays.split(",")]
+    stubs = [make_stub(f"stub_tool_{i}", delay) for i, delay in enumerate(delays)]
+    tool_map = {stub.__name__: stub for stub in stubs}
+    calls = [(stub.__name__, {"city": f"City {i}"}) for i, stub in enumerate(stubs)]
+
+    start = time.perf_counter()
+    sequential = [main_agent._call_tool(tool_map, name, call_args) for name, call_args in calls]
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = main_agent.dispatch_tool_calls(calls, tool_map)
+    concurrent_time = time.perf_counter() - start
+    assert concurrent == sequential, "results must come back in call order"
+
+    # Puro agent turn, fake model shob tool ek turn-e chay
+    model = FakeGenerativeModel(first_token_delay=0.0, chunk_delay=0.0, tool_plan=lambda prompt: calls)
+    start = time.perf_counter()
+    main_agent.run_agent_turn(model.start_chat(), "weather in three cities", stubs)
+    turn_time = time.perf_counter() - start
+
+    print(f"tool latencies         sum {sum(delays) * 1000:7.1f} ms, max {max(delays) * 1000:7.1f} ms")
+    print(f"sequential             {sequential_time * 1000:7.1f} ms")
+    print(f"dispatch_tool_calls    {concurrent_time * 1000:7.1f} ms")
+    print(f"full agent turn        {turn_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_write_queue.py
+# Throughput benchmark: onek concurrent session message likhle synchronous
+# save_message vs write-behind queue_message (batched executemany).
+#
+# Run from the repo root:  python -m benchmarks.bench_write_queue
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import database as db
+
+
+def _run_sessions(write, sessions, messages):
+    def session(user_id):
+        for i in range(messages):
+            write(user_id, "user" if i % 2 == 0 else "assistant", f"message {i} from {user_id}")
+
+    threads = [threading.Thread(target=session, args=(uid,)) for uid in range(1, sessions + 1)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-behind queue throughput benchmark")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--messages", type=int, default=200, help="messages per session")
+    args = parser.parse_args()
+    total = args.sessions * args.messages
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        db.close_all_connections()
+        db.init_db()
+
+        sync_time = _run_sessions(db.save_message, args.sessions, args.messages)
+
+        def queued_write(user_id, role, content):
+            db.queue_message(user_id, role, content)
+
+        # Enqueue time + shesh flush porjonto shob message commit howar time
+        queued_start = time.perf_counter()
+        _run_sessions(queued_write, args.sessions, args.messages)
+        db.flush_messages()
+        queued_time = time.perf_counter() - queued_start
+
+        with db.get_db_connection() as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM chat_history").fetchone()[0]
+        db.shutdown_writer()
+        db.close_all_connections()
+
+    print(f"{args.sessions} sessions x {args.messages} messages ({total} writes)")
+    print(f"save_message  (sync)   {total / sync_time:>10.0f} msgs/sec")
+    print(f"queue_message (batch)  {total / queued_time:>10.0f} msgs/sec")
+    print(f"rows stored: {stored} (expected {2 * total})")
+
+
+if __name__ == "__main__":
+    main()
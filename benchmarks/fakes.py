@@ -0,0 +1,219 @@
+# benchmarks/fakes.py
+# Network chara benchmark chalanor jonno Gemini-r fake stand-in.
+# Shape-ta google.generativeai-er streamed response-er moto:
+# chunk.candidates[0].content.parts -> part.text / part.function_call
+
+import threading
+import time
+from types import SimpleNamespace
+
+
+def _text_chunk(text):
+    part = SimpleNamespace(text=text, function_call=None)
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def _call_chunk(calls):
+    parts = [
+        SimpleNamespace(text="", function_call=SimpleNamespace(name=name, args=args))
+        for name, args in calls
+    ]
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))])
+
+
+class FakeStream:
+    """Iterable response that sleeps first_token_delay, then chunk_delay between chunks."""
+
+    def __init__(self, chunks, first_token_delay, chunk_delay):
+        self.chunks = chunks
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+
+    def __iter__(self):
+        time.sleep(self.first_token_delay)
+        for index, chunk in enumerate(self.chunks):
+            if index:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+
+class FakeChatSession:
+    """
+    Stand-in for genai.ChatSession. tool_plan(prompt) returns the function calls the
+    "model" asks for on the first round, e.g. [("get_weather", {"city": "Kolkata"})].
+    """
+
+    def __init__(self, model, history=None):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, content, stream=False):
+        model = self.model
+        if isinstance(content, str):
+            self.history.append({"role": "user", "parts": [content]})
+            calls = model.tool_plan(content) if model.tool_plan else []
+            if calls:
+                chunks = [_call_chunk(calls)]
+                return self._respond(chunks, stream)
+            answer = model.answer(content)
+        else:
+            # function_response list: tool result-gulo jure final answer
+            self.history.append({"role": "user", "parts": content})
+            results = [item["function_response"]["response"]["result"] for item in content]
+            answer = model.answer(" ".join(str(result) for result in results))
+
+        words = answer.split(" ")
+        size = max(1, len(words) // model.chunks)
+        chunks = [
+            _text_chunk(" ".join(words[i:i + size]) + (" " if i + size < len(words) else ""))
+            for i in range(0, len(words), size)
+        ]
+        self.history.append({"role": "model", "parts": [answer]})
+        return self._respond(chunks, stream)
+
+    def _respond(self, chunks, stream):
+        model = self.model
+        response = FakeStream(chunks, model.first_token_delay, model.chunk_delay)
+        if stream:
+            return response
+        # Non-streaming call puro answer-er jonno wait kore
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(
+                parts=[part for chunk in response for part in chunk.candidates[0].content.parts]))]
+        )
+
+
+class FakeGenerativeModel:
+    """Stand-in for genai.GenerativeModel with configurable latency and chunking."""
+
+    def __init__(self, model_name="fake-gemini", tools=None, system_instruction=None,
+                 first_token_delay=0.3, chunk_delay=0.05, chunks=20, tool_plan=None,
+                 answer=None):
+        self.model_name = model_name
+        self.tools = tools or []
+        self.system_instruction = system_instruction
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks
+        self.tool_plan = tool_plan
+        self.answer = answer or (lambda text: ("Here is a detailed answer about " + text + ". ") * 5)
+
+    def start_chat(self, history=None, **kwargs):
+        return FakeChatSession(self, history)
+
+
+# --- Fake upstream APIs (OpenWeather, GNews, SerpAPI) for benchmarks.stub_server ---
+
+def fake_article(title, paragraphs, noise=20):
+    """An HTML page like a real article: the paragraphs plus scripts, styles, nav and footer."""
+    body = "".join(f"<p>{paragraph}</p>\n" for paragraph in paragraphs)
+    menu = "".join(f"<li><a href='/section/{i}'>Section {i}</a></li>" for i in range(noise))
+    script = "var tracking = {" + ", ".join(f"k{i}: {i}" for i in range(noise * 10)) + "};"
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title><style>body {{ margin: 0 }}</style>"
+        f"<script>{script}</script></head><body><header><nav><ul>{menu}</ul></nav></header>"
+        f"<main><article><h1>{title}</h1>\n{body}</article></main>"
+        f"<footer>&copy; Fake Times. Cookie policy, privacy, terms.</footer></body></html>"
+    )
+
+
+def fake_upstream_routes(latency=0.1, pages=5):
+    """StubServer routes answering like the real APIs after `latency` seconds."""
+
+    def weather(handler):
+        time.sleep(latency)
+        return 200, {"main": {"temp": 31.5}, "weather": [{"description": "haze"}]}, None
+
+    def gnews(handler):
+        time.sleep(latency)
+        articles = [
+            {"title": f"Headline {i}", "source": {"name": "Fake Times"}} for i in range(5)
+        ]
+        return 200, {"totalArticles": len(articles), "articles": articles}, None
+
+    def serpapi(handler):
+        time.sleep(latency)
+        # Result link-gulo ei server-er-i /page/<i>, jate deep_research-er page fetch-o local thake
+        base = f"http://{handler.headers['Host']}"
+        results = [
+            {"title": f"Result {i}", "snippet": "A short snippet about the topic.", "link": f"{base}/page/{i}"}
+            for i in range(pages)
+        ]
+        return 200, {"organic_results": results}, None
+
+    def page(handler):
+        time.sleep(latency)
+        paragraphs = [f"Paragraph {i} about the topic with some detail for the reader." for i in range(30)]
+        return 200, fake_article("Fake article", paragraphs), None
+
+    routes = {"/weather": weather, "/gnews": gnews, "/serpapi": serpapi}
+    routes.update({f"/page/{i}": page for i in range(pages)})
+    return routes
+
+
+def point_tools_at(base_url):
+    """Points the weather, news and research tools at a local fake server."""
+    from tools import news_tool, research_tool, weather_tool
+
+    weather_tool.WEATHER_URL, weather_tool.API_KEY = f"{base_url}/weather", "fake"
+    news_tool.NEWS_URL, news_tool.API_KEY = f"{base_url}/gnews", "fake"
+    research_tool.SERPAPI_URL, research_tool.API_KEY = f"{base_url}/serpapi", "fake"
+
+
+class FakeSMTP:
+    """Stand-in for smtplib.SMTP / SMTP_SSL with a configurable connect and send latency."""
+
+    connect_latency = 0.2
+    send_latency = 0.02
+    sent = 0
+
+    def __init__(self, host=None, port=None, timeout=None, context=None):
+        time.sleep(self.connect_latency)
+
+    def login(self, user, password):
+        pass
+
+    def sendmail(self, sender, receiver, message):
+        time.sleep(self.send_latency)
+        FakeSMTP.sent += 1
+
+    def quit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.quit()
+
+
+class FakeClock:
+    """
+    Clock for tools.quota.QuotaScheduler: sleep() moves time forward instantly.
+    With auto_advance=False sleep() only yields and time moves only via advance().
+    """
+
+    def __init__(self, start=1_700_000_000.0, auto_advance=True):
+        self._now = start
+        self._lock = threading.Lock()
+        self.auto_advance = auto_advance
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self._now
+
+    def time(self):
+        return self._now
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += seconds
+
+    def sleep(self, seconds):
+        if not self.auto_advance:
+            time.sleep(0.001)
+            return
+        with self._lock:
+            self._now += seconds
+            self.slept += seconds
+        time.sleep(0)  # onno thread-ke chance dei
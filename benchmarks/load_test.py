@@ -0,0 +1,207 @@
+# benchmarks/load_test.py
+# Offline load test: simulated concurrent user-ra real code path chalay -
+# check_user diye login, history load, stream_cached_turn (agent + tools),
+# queue_message. Gemini, OpenWeather, GNews, SerpAPI ar SMTP shob local fake,
+# latency configurable. Result JSON-e likhe ager run-er shathe compare kora jay.
+#
+# Run from the repo root:
+#   python -m benchmarks.load_test --users 20 --turns 5 --output after.json --compare before.json
+
+import argparse
+import json
+import os
+import random
+import smtplib
+import tempfile
+import threading
+import time
+
+from benchmarks.fakes import FakeGenerativeModel, FakeSMTP, fake_upstream_routes, point_tools_at
+from benchmarks.stub_server import StubServer
+
+PROMPTS = [
+    "What's the weather in Kolkata?",
+    "latest news",
+    "deep research on ISRO",
+    "solve 12*(3+4)",
+    "Tell me a fun fact about tigers",
+]
+PASSWORD = "load-test-password"
+
+
+def _tool_plan(prompt):
+    text = prompt.lower()
+    if "weather" in text:
+        return [("get_weather", {"city": "Kolkata"})]
+    if "news" in text:
+        return [("get_latest_news", {"topic": "news"})]
+    if "research" in text:
+        return [("deep_research", {"topic": "ISRO"})]
+    if "solve" in text:
+        return [("solve_math", {"expression": "12*(3+4)"})]
+    return []
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    pick = lambda q: values[min(len(values) - 1, int(round(q * (len(values) - 1))))] * 1000
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def run(args):
+    # Module-gulo import-er age env set kori, jate cache file temp dir-e thake
+    tmp = tempfile.mkdtemp(prefix="yesai-load-")
+    os.environ["RESEARCH_CACHE_DB"] = os.path.join(tmp, "research_cache.db")
+    # Load test quota-r jonno na, tai limit onek boro ar counter temp file-e
+    os.environ["QUOTA_DB"] = os.path.join(tmp, "api_quota.db")
+    for provider in ("OPENWEATHER", "GNEWS", "SERPAPI"):
+        os.environ[f"QUOTA_{provider}_PER_MINUTE"] = "100000"
+        os.environ[f"QUOTA_{provider}_PER_DAY"] = "1000000"
+
+    import database as db
+    import main_agent
+    import tracing
+    from tools import email_tool, research_cache
+    from tools.registry import TOOLS
+
+    db.DATABASE_NAME = os.path.join(tmp, "users.db")
+    research_cache.RESEARCH_CACHE_DB = os.environ["RESEARCH_CACHE_DB"]
+    db.close_all_connections()
+    tracing.reset()
+
+    FakeSMTP.connect_latency, FakeSMTP.send_latency = args.smtp_latency, args.smtp_latency / 10
+    smtplib.SMTP = smtplib.SMTP_SSL = FakeSMTP
+    email_tool.SENDER_EMAIL, email_tool.SENDER_PASSWORD = "bench@example.com", "fake"
+
+    model = FakeGenerativeModel(
+        first_token_delay=args.model_latency, chunk_delay=args.chunk_latency,
+        tool_plan=_tool_plan,
+    )
+
+    print(f"creating {args.users} users...")
+    emails = [f"user{i}@example.com" for i in range(args.users)]
+    for i, email in enumerate(emails):
+        db.add_user(f"user{i}", email, PASSWORD)
+
+    timings = {"login": [], "history": [], "turn": [], "first_token": [], "signup_otp": []}
+    timings_lock = threading.Lock()
+    errors = []
+
+    def timed(name, started):
+        with timings_lock:
+            timings[name].append(time.perf_counter() - started)
+
+    def simulated_user(index):
+        rng = random.Random(index)
+        try:
+            started = time.perf_counter()
+            user = db.check_user(emails[index], PASSWORD)
+            timed("login", started)
+
+            started = time.perf_counter()
+            conversation_id = db.current_conversation(user['id'])
+            db.load_history_page(user['id'], conversation_id=conversation_id)
+            timed("history", started)
+
+            if rng.random() < args.signup_ratio:
+                started = time.perf_counter()
+                otp = db.create_otp(f"new{index}@example.com", "signup")
+                job = email_tool.enqueue_otp_email(f"new{index}@example.com", otp)
+                db.verify_otp(f"new{index}@example.com", "signup", otp)
+                timed("signup_otp", started)
+                email_tool.wait_for_delivery(job)
+
+            chat = model.start_chat()
+            for _ in range(args.turns):
+                prompt = rng.choice(PROMPTS)
+                db.queue_message(user['id'], "user", prompt, conversation_id)
+                started = time.perf_counter()
+                chunks = []
+                for chunk in main_agent.stream_cached_turn(chat, prompt, TOOLS):
+                    if not chunks:
+                        timed("first_token", started)
+                    chunks.append(chunk)
+                timed("turn", started)
+                db.queue_message(user['id'], "assistant", "".join(chunks), conversation_id)
+                time.sleep(rng.uniform(0, args.think_time))
+        except Exception as e:
+            errors.append(repr(e))
+
+    with StubServer(fake_upstream_routes(args.api_latency)) as server:
+        point_tools_at(server.url)
+        threads = [threading.Thread(target=simulated_user, args=(i,)) for i in range(args.users)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        db.flush_messages()
+        elapsed = time.perf_counter() - started
+
+    spans = tracing.latency_summary()
+    db_spans = {name: stats for name, stats in spans.items() if name.startswith("db.")}
+    results = {
+        "config": vars(args),
+        "elapsed_s": elapsed,
+        "throughput": {
+            "turns_per_s": len(timings["turn"]) / elapsed,
+            "users_per_s": args.users / elapsed,
+        },
+        "latency": {name: {"count": len(values), **_percentiles(values)} for name, values in timings.items()},
+        "db_contention": {"pool": db.pool_stats(), "spans": db_spans},
+        "spans": spans,
+        "errors": errors,
+    }
+    db.shutdown_writer()
+    db.close_all_connections()
+    return results
+
+
+def _print_results(results, baseline=None):
+    print(f"\nelapsed {results['elapsed_s']:.2f}s, "
+          f"{results['throughput']['turns_per_s']:.1f} turns/s, errors: {len(results['errors'])}")
+    print(f"{'operation':<14} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in results["latency"].items():
+        line = f"{name:<14} {stats['count']:>6} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        if baseline and name in baseline["latency"] and baseline["latency"][name]["p95_ms"]:
+            before = baseline["latency"][name]["p95_ms"]
+            line += f"   p95 {(stats['p95_ms'] - before) / before * 100:+.0f}% vs baseline"
+        print(line)
+    pool = results["db_contention"]["pool"]
+    print(f"db pool: {pool}")
+    if baseline:
+        before = baseline["throughput"]["turns_per_s"]
+        after = results["throughput"]["turns_per_s"]
+        print(f"throughput {after:.1f} turns/s vs {before:.1f} ({(after - before) / before * 100:+.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test with fake Gemini and tool APIs")
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--turns", type=int, default=5, help="chat turns per user")
+    parser.add_argument("--think-time", type=float, default=0.2, help="max pause between turns (s)")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="fake Gemini time to first chunk (s)")
+    parser.add_argument("--chunk-latency", type=float, default=0.02, help="fake Gemini delay between chunks (s)")
+    parser.add_argument("--api-latency", type=float, default=0.15, help="fake weather/news/search latency (s)")
+    parser.add_argument("--smtp-latency", type=float, default=0.3, help="fake SMTP connect latency (s)")
+    parser.add_argument("--signup-ratio", type=float, default=0.1, help="share of users that also do a signup OTP")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    args = parser.parse_args()
+
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
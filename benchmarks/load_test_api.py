@@ -0,0 +1,471 @@
+# benchmarks/load_test_api.py
+# Headless API (api_server.py) bonam Streamlit path: ek core-e koto session chole.
+# Server duto-i alada child process-e chole, jate load generator-er CPU mapa na hoy:
+#   api        api_server asyncio server; client-ra (asyncio) HTTP diye login, history, chat
+#   streamlit  app.py AppTest diye; protiti session login + chat turn (fragment rerun, browser-er moto)
+# Model fake (FakeGenerativeModel), weather/news/search parent-er StubServer-e. Tin bhag:
+#   1. cpu:         session-prati server CPU (login, turn) -> ek core-e koto session
+#   2. concurrency: realistic latency-te onek session ek-shathe API-te (p50/p95, 503 retry)
+#   3. overload:    chhoto agent pool-e burst; beshi load 503 + Retry-After pay, queue jome na
+# Streamlit-er CPU-te AppTest-er element tree parse-o dhora ache; script-only time alada dekhano hoy.
+#
+# Run from the repo root:
+#   python -m benchmarks.load_test_api --sessions 40 --concurrent 500 --output api.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fakes import FakeGenerativeModel, fake_upstream_routes, point_tools_at
+from benchmarks.load_test import PASSWORD, PROMPTS, _percentiles, _tool_plan
+from benchmarks.stub_server import StubServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --- Child processes ---
+
+def _fake_model(args):
+    point_tools_at(args.upstream)
+    return FakeGenerativeModel(
+        first_token_delay=args.model_latency, chunk_delay=args.chunk_latency, tool_plan=_tool_plan,
+    )
+
+
+def api_child(args):
+    import api_server
+    import database as db
+
+    db.DATABASE_NAME = args.db
+    model = _fake_model(args)
+    api = api_server.ApiServer(lambda: model)
+
+    async def serve():
+        server = await api.start("127.0.0.1", 0)
+        print(json.dumps({"port": server.sockets[0].getsockname()[1]}), flush=True)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def streamlit_child(args):
+    import logging
+    import warnings
+
+    from streamlit.testing.v1 import AppTest
+
+    import database as db
+    import main_agent
+    from benchmarks.bench_render import _fragment_turn, _script_times
+
+    warnings.simplefilter("ignore")
+    # AppTest bare mode-e protiti session-e "missing ScriptRunContext" warning dey
+    # (config load-e Streamlit shob logger-er level abar set kore, tai disable)
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    db.DATABASE_NAME = args.db
+    model = _fake_model(args)
+    main_agent.build_model = lambda *a, **kw: model
+    rng = random.Random(1)
+
+    def session(email, totals):
+        _script_times.clear()
+        started = time.process_time()
+        at = AppTest.from_file("../app.py", default_timeout=600)
+        at.secrets["GEMINI_API_KEY"] = "fake"
+        at.run()
+        at.text_input[0].input(email)
+        at.text_input[1].input(PASSWORD)
+        at.button[0].click()
+        at.run()
+        assert at.session_state.logged_in and not at.exception, at.exception
+        totals["login_cpu_s"] += time.process_time() - started
+        totals["login_script_s"] += sum(_script_times) / 1000
+
+        for _ in range(args.turns):
+            _script_times.clear()
+            started = time.process_time()
+            _fragment_turn(at, rng.choice(PROMPTS))
+            totals["turn_cpu_s"] += time.process_time() - started
+            totals["turn_script_s"] += sum(_script_times) / 1000
+            assert at.session_state.messages[-1]["role"] == "assistant"
+
+    # Prothom session import ar cache garam kore, mapa hoy na
+    session(args.emails[0], dict.fromkeys(["login_cpu_s", "login_script_s", "turn_cpu_s", "turn_script_s"], 0.0))
+    totals = dict.fromkeys(["login_cpu_s", "login_script_s", "turn_cpu_s", "turn_script_s"], 0.0)
+    for email in args.emails[1:]:
+        session(email, totals)
+    db.flush_messages()
+    print(json.dumps({"sessions": len(args.emails) - 1, "turns": args.turns, **totals}), flush=True)
+
+
+# --- Load generator ---
+
+class ApiClient:
+    """Minimal keep-alive HTTP/1.1 JSON client on asyncio streams; one per simulated session."""
+
+    def __init__(self, port):
+        self.port = port
+        self.token = None
+        self.retries = 0
+        self._reader = self._writer = None
+
+    async def request(self, method, path, body=None, on_item=None, retry=True):
+        """Returns (status, headers, payload); a streamed body becomes the list of NDJSON items."""
+        while True:
+            status, headers, payload = await self._send(method, path, body, on_item)
+            if status != 503 or not retry:
+                return status, headers, payload
+            self.retries += 1
+            await asyncio.sleep(float(headers.get("retry-after", "1")))
+
+    async def _send(self, method, path, body, on_item):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection("127.0.0.1", self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n"
+        if self.token:
+            head += f"Authorization: Bearer {self.token}\r\n"
+        self._writer.write(head.encode("latin-1") + b"\r\n" + data)
+
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while (line := await self._reader.readline()) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding") == "chunked":
+            payload = []
+            while size := int(await self._reader.readline(), 16):
+                item = json.loads(await self._reader.readexactly(size + 2))
+                payload.append(item)
+                if on_item:
+                    on_item(item)
+            await self._reader.readexactly(2)
+        else:
+            body = await self._reader.readexactly(int(headers.get("content-length", "0")))
+            payload = json.loads(body) if body else None
+        if headers.get("connection") == "close":
+            self.close()
+        return status, headers, payload
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+async def _health(port):
+    client = ApiClient(port)
+    try:
+        return (await client.request("GET", "/health"))[2]
+    finally:
+        client.close()
+
+
+async def _login(client, email, timings=None):
+    started = time.perf_counter()
+    status, _, payload = await client.request("POST", "/login", {"email": email, "password": PASSWORD})
+    assert status == 200, (status, payload)
+    client.token = payload["token"]
+    if timings is not None:
+        timings["login"].append(time.perf_counter() - started)
+
+
+async def _chat(client, prompt, timings=None):
+    started = time.perf_counter()
+    first = []
+
+    def on_item(item):
+        if not first:
+            first.append(time.perf_counter() - started)
+
+    status, _, payload = await client.request("POST", "/chat", {"message": prompt}, on_item)
+    assert status == 200 and payload[-1].get("done"), (status, payload)
+    if timings is not None:
+        timings["first_token"].append(first[0])
+        timings["turn"].append(time.perf_counter() - started)
+
+
+def _create_users(db, prefix, count, rounds):
+    # Protiti user-e ek-i hash; add_user-er moto bcrypt, shudhu bar bar hash kori na
+    import bcrypt
+
+    password_hash = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    emails = [f"{prefix}{i}@example.com" for i in range(count)]
+    with db.get_db_connection() as conn, conn:
+        conn.executemany(
+            "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, datetime('now'))",
+            [(email.split("@")[0], email, password_hash) for email in emails])
+    return emails
+
+
+def _child_command(mode, args, model_latency, chunk_latency, upstream):
+    return [
+        sys.executable, "-m", "benchmarks.load_test_api", "--child", mode, "--db", args.db,
+        "--upstream", upstream, "--model-latency", str(model_latency),
+        "--chunk-latency", str(chunk_latency), "--turns", str(args.turns),
+    ]
+
+
+class ApiProcess:
+    """api_server in a child process; stopped on exit."""
+
+    def __init__(self, args, upstream, model_latency=0.0, chunk_latency=0.0, env=None):
+        self.proc = subprocess.Popen(
+            _child_command("api", args, model_latency, chunk_latency, upstream),
+            cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True, env={**os.environ, **(env or {})})
+        self.port = json.loads(self.proc.stdout.readline())["port"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def streamlit_cpu(args, upstream, emails):
+    command = _child_command("streamlit", args, 0.0, 0.0, upstream) + ["--emails", *emails]
+    result = subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True, check=True)
+    totals = json.loads(result.stdout.strip().splitlines()[-1])
+    sessions, turns = totals["sessions"], totals["sessions"] * totals["turns"]
+    return {
+        "sessions": sessions,
+        "login_cpu_ms": totals["login_cpu_s"] / sessions * 1000,
+        "turn_cpu_ms": totals["turn_cpu_s"] / turns * 1000,
+        "login_script_ms": totals["login_script_s"] / sessions * 1000,
+        "turn_script_ms": totals["turn_script_s"] / turns * 1000,
+    }
+
+
+async def api_cpu(args, port, emails):
+    # Prothom session garam kore (model, tool import), mapa hoy na
+    warm = ApiClient(port)
+    await _login(warm, emails[0])
+    await _chat(warm, PROMPTS[0])
+    warm.close()
+
+    clients = [ApiClient(port) for _ in emails[1:]]
+    limit = asyncio.Semaphore(args.cpu_concurrency)
+
+    async def limited(coroutine):
+        async with limit:
+            await coroutine
+
+    cpu_start = (await _health(port))["cpu_s"]
+    await asyncio.gather(*(limited(_login(client, email)) for client, email in zip(clients, emails[1:])))
+    cpu_login = (await _health(port))["cpu_s"]
+
+    async def turns(client, index):
+        rng = random.Random(index)
+        for _ in range(args.turns):
+            await _chat(client, rng.choice(PROMPTS))
+
+    await asyncio.gather(*(limited(turns(client, i)) for i, client in enumerate(clients)))
+    cpu_end = (await _health(port))["cpu_s"]
+    for client in clients:
+        client.close()
+    return {
+        "sessions": len(clients),
+        "login_cpu_ms": (cpu_login - cpu_start) / len(clients) * 1000,
+        "turn_cpu_ms": (cpu_end - cpu_login) / (len(clients) * args.turns) * 1000,
+    }
+
+
+async def api_concurrency(args, port, emails):
+    timings = {"login": [], "history": [], "first_token": [], "turn": [], "search": []}
+    errors = []
+    clients = [ApiClient(port) for _ in emails]
+    cpu_start = (await _health(port))["cpu_s"]
+
+    async def simulated_user(index, client):
+        rng = random.Random(index)
+        try:
+            await asyncio.sleep(rng.uniform(0, args.ramp_up))
+            await _login(client, emails[index], timings)
+            started = time.perf_counter()
+            status, _, _ = await client.request("GET", "/history")
+            assert status == 200, status
+            timings["history"].append(time.perf_counter() - started)
+            for _ in range(args.turns):
+                await asyncio.sleep(rng.uniform(0, args.think_time))
+                await _chat(client, rng.choice(PROMPTS), timings)
+            started = time.perf_counter()
+            status, _, _ = await client.request("GET", "/search?q=weather")
+            assert status == 200, status
+            timings["search"].append(time.perf_counter() - started)
+        except Exception as e:
+            errors.append(repr(e))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(simulated_user(i, client) for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - started
+    health = await _health(port)
+    for client in clients:
+        client.close()
+    return {
+        "sessions": len(clients),
+        "elapsed_s": elapsed,
+        "server_cpu_s": health["cpu_s"] - cpu_start,
+        "turns_per_s": len(timings["turn"]) / elapsed,
+        "retries_503": sum(client.retries for client in clients),
+        "latency": {name: {"count": len(values), **_percentiles(values)} for name, values in timings.items()},
+        "pools": health["pools"],
+        "errors": errors,
+    }
+
+
+async def api_overload(args, port, emails):
+    clients = [ApiClient(port) for _ in emails]
+    for client, email in zip(clients, emails):
+        await _login(client, email)
+
+    async def burst_turn(client):
+        started = time.perf_counter()
+        status, headers, _ = await client.request("POST", "/chat", {"message": "latest news"}, retry=False)
+        return status, headers.get("retry-after"), time.perf_counter() - started
+
+    results = await asyncio.gather(*(burst_turn(client) for client in clients))
+    health = await _health(port)
+    for client in clients:
+        client.close()
+    rejected = [seconds for status, retry_after, seconds in results if status == 503 and retry_after]
+    served = [seconds for status, _, seconds in results if status == 200]
+    return {
+        "burst": len(clients),
+        "served": len(served),
+        "rejected_503": len(rejected),
+        "rejected_latency": _percentiles(rejected),
+        "served_latency": _percentiles(served),
+        "pools": health["pools"],
+    }
+
+
+def run(args):
+    # Child-ra ei env pay: cache ar quota counter temp dir-e, quota limit onek boro
+    tmp = tempfile.mkdtemp(prefix="yesai-api-load-")
+    os.environ["RESEARCH_CACHE_DB"] = os.path.join(tmp, "research_cache.db")
+    os.environ["QUOTA_DB"] = os.path.join(tmp, "api_quota.db")
+    for provider in ("OPENWEATHER", "GNEWS", "SERPAPI"):
+        os.environ[f"QUOTA_{provider}_PER_MINUTE"] = "1000000"
+        os.environ[f"QUOTA_{provider}_PER_DAY"] = "10000000"
+    args.db = os.path.join(tmp, "users.db")
+
+    import database as db
+
+    db.DATABASE_NAME = args.db
+    print("creating users...")
+    # cpu bhag-e asol bcrypt cost; baki bhag-e sasta hash, jate run-ta chat path mape, bcrypt na
+    cpu_api_users = _create_users(db, "api", args.sessions + 1, 12)
+    cpu_streamlit_users = _create_users(db, "st", args.streamlit_sessions + 1, 12)
+    concurrent_users = _create_users(db, "many", args.concurrent, 4)
+    burst_users = _create_users(db, "burst", args.burst, 4)
+    db.close_all_connections()
+
+    results = {"config": {key: value for key, value in vars(args).items() if key != "emails"}}
+    with StubServer(fake_upstream_routes(0.0)) as server:
+        print(f"cpu: streamlit path, {args.streamlit_sessions} sessions x {args.turns} turns...")
+        streamlit = streamlit_cpu(args, server.url, cpu_streamlit_users)
+        print(f"cpu: api path, {args.sessions} sessions x {args.turns} turns...")
+        with ApiProcess(args, server.url) as api:
+            api_result = asyncio.run(api_cpu(args, api.port, cpu_api_users))
+    results["cpu"] = {"streamlit": streamlit, "api": api_result}
+    for path in results["cpu"].values():
+        session_cpu_s = (path["login_cpu_ms"] + args.turns * path["turn_cpu_ms"]) / 1000
+        path["session_cpu_ms"] = session_cpu_s * 1000
+        # Ek session-e args.turns turn, protiti args.pace second por por
+        path["sessions_per_core"] = args.turns * args.pace / session_cpu_s
+
+    with StubServer(fake_upstream_routes(args.api_latency)) as server:
+        print(f"concurrency: {args.concurrent} API sessions at once...")
+        with ApiProcess(args, server.url, args.model_latency, args.chunk_latency) as api:
+            results["concurrency"] = asyncio.run(api_concurrency(args, api.port, concurrent_users))
+        print(f"overload: {args.burst} simultaneous turns, 4 agent workers + 8 queued...")
+        with ApiProcess(args, server.url, 1.0, 0.0, {"API_AGENT_WORKERS": "4", "API_MAX_QUEUED": "8"}) as api:
+            results["overload"] = asyncio.run(api_overload(args, api.port, burst_users))
+    return results
+
+
+def _print_results(results, baseline=None):
+    config = results["config"]
+    print(f"\nserver CPU per session (1 login + {config['turns']} turns, fake model, no latency)")
+    print(f"{'path':<10} {'login ms':>9} {'turn ms':>8} {'session ms':>11} {'sessions/core':>14}")
+    for name, path in results["cpu"].items():
+        line = (f"{name:<10} {path['login_cpu_ms']:9.1f} {path['turn_cpu_ms']:8.1f} "
+                f"{path['session_cpu_ms']:11.1f} {path['sessions_per_core']:14.0f}")
+        if baseline:
+            before = baseline["cpu"][name]["sessions_per_core"]
+            line += f"   {(path['sessions_per_core'] - before) / before * 100:+.0f}% vs baseline"
+        print(line)
+    streamlit = results["cpu"]["streamlit"]
+    print(f"(sessions/core: one turn every {config['pace']:.0f} s; streamlit script-only "
+          f"{streamlit['login_script_ms']:.1f} ms login, {streamlit['turn_script_ms']:.1f} ms turn, "
+          f"rest is AppTest)")
+    ratio = results["cpu"]["api"]["sessions_per_core"] / streamlit["sessions_per_core"]
+    turn_ratio = streamlit["turn_cpu_ms"] / results["cpu"]["api"]["turn_cpu_ms"]
+    print(f"api: {ratio:.1f}x sessions per core, {turn_ratio:.1f}x less CPU per turn")
+
+    concurrency = results["concurrency"]
+    print(f"\n{concurrency['sessions']} concurrent API sessions: {concurrency['elapsed_s']:.1f}s, "
+          f"{concurrency['turns_per_s']:.1f} turns/s, server CPU {concurrency['server_cpu_s']:.1f}s "
+          f"({concurrency['server_cpu_s'] / concurrency['elapsed_s'] * 100:.0f}% of one core), "
+          f"503 retries: {concurrency['retries_503']}, errors: {len(concurrency['errors'])}")
+    print(f"{'operation':<12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in concurrency["latency"].items():
+        print(f"{name:<12} {stats['count']:>6} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+    overload = results["overload"]
+    print(f"\noverload: {overload['burst']} turns at once -> {overload['served']} served "
+          f"(p95 {overload['served_latency']['p95_ms']:.0f} ms), {overload['rejected_503']} rejected with 503 "
+          f"+ Retry-After (p95 {overload['rejected_latency']['p95_ms']:.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless API vs Streamlit load test with fake Gemini and tools")
+    parser.add_argument("--sessions", type=int, default=40, help="API sessions for the CPU comparison")
+    parser.add_argument("--streamlit-sessions", type=int, default=10, help="Streamlit (AppTest) sessions")
+    parser.add_argument("--turns", type=int, default=3, help="chat turns per session")
+    parser.add_argument("--cpu-concurrency", type=int, default=20, help="API sessions at once in the CPU part")
+    parser.add_argument("--pace", type=float, default=20.0, help="seconds between a user's turns (sessions/core)")
+    parser.add_argument("--concurrent", type=int, default=500, help="API sessions at once in the concurrency part")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="spread the concurrent logins over this many s")
+    parser.add_argument("--think-time", type=float, default=20.0, help="max pause between turns (s)")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="fake Gemini time to first chunk (s)")
+    parser.add_argument("--chunk-latency", type=float, default=0.02, help="fake Gemini delay between chunks (s)")
+    parser.add_argument("--api-latency", type=float, default=0.15, help="fake weather/news/search latency (s)")
+    parser.add_argument("--burst", type=int, default=40, help="simultaneous turns in the overload part")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    # Child process-er jonno
+    parser.add_argument("--child", choices=["api", "streamlit"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--upstream", help=argparse.SUPPRESS)
+    parser.add_argument("--emails", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "api":
+        return api_child(args)
+    if args.child == "streamlit":
+        return streamlit_child(args)
+
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/stub_server.py
+# Local HTTP/1.1 stub server (keep-alive) for benchmarks, jate real API hit na kore
+# tool-gulo measure kora jay.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, connection reuse measure korar jonno
+    # Header ar body alada write hoy; Nagle on thakle reuse kora connection-e protiti
+    # response delayed ACK-er jonno ~40 ms boshe thake
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        routes = self.server.routes
+        path = self.path.split("?", 1)[0]
+        handler = routes.get(path)
+        if handler is None:
+            self._send(404, {"error": "not found"})
+            return
+        status, body, headers = handler(self)
+        self._send(status, body, headers)
+
+    def _send(self, status, body, headers=None):
+        if isinstance(body, (dict, list)):
+            payload = json.dumps(body).encode("utf-8")
+            content_type = "application/json"
+        else:
+            payload = body.encode("utf-8") if isinstance(body, str) else body
+            content_type = "text/html; charset=utf-8"
+        headers = {"Content-Type": content_type, **(headers or {})}
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """
+    Runs a ThreadingHTTPServer on 127.0.0.1 in a background thread.
+    routes maps a path to a callable(handler) returning (status, body, headers).
+    """
+
+    def __init__(self, routes):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.routes = routes
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
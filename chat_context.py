@@ -0,0 +1,118 @@
+# chat_context.py
+
+# User fire ele purono conversation-er context model-ke abar dite hoy, kintu puro
+# history replay korle protiti turn-e prompt boro hote thakbe. Tai token budget-er
+# moddhe latest message-gulo hubohu rakha hoy ar tar ager shob kichu ekta rolling
+# summary-te compact kora hoy. Summary DB-te save thake, protibar login-e notun kore
+# generate korte hoy na.
+
+import os
+
+import database as db
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "400"))
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gemini-2.0-flash")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+def gemini_summarizer(previous_summary: str, rows) -> str:
+    """Folds older messages into the running summary with a plain (tool-less) Gemini call."""
+    import google.generativeai as genai
+
+    transcript = "\n".join(f"{row['role']}: {row['content']}" for row in rows)
+    prompt = (
+        "Update the running summary of a conversation between a user and the assistant YES Ai. "
+        "Keep facts, names, user preferences and unanswered questions. "
+        f"Write at most {SUMMARY_TOKEN_BUDGET * 3 // 4} words.\n\n"
+        f"Current summary:\n{previous_summary or '(none)'}\n\n"
+        f"New messages:\n{transcript}"
+    )
+    return genai.GenerativeModel(SUMMARY_MODEL).generate_content(prompt).text.strip()
+
+
+def extractive_summarizer(previous_summary: str, rows) -> str:
+    """Model-free fallback: clipped message openings, trimmed to the summary budget."""
+    lines = [previous_summary] if previous_summary else []
+    lines += [f"{row['role']}: {row['content'][:200]}" for row in rows]
+    text = "\n".join(lines)
+    return text[-SUMMARY_TOKEN_BUDGET * 4:]
+
+
+def _select_recent(user_id, conversation_id, budget):
+    """
+    Walks back through history page by page, keeping the newest messages that fit in
+    budget. Returns (recent rows oldest first, id of the newest message left out or None).
+    """
+    recent, used, cursor = [], 0, None
+    while True:
+        page, next_cursor = db.load_history_page(user_id, before_id=cursor, conversation_id=conversation_id)
+        for row in reversed(page):
+            cost = estimate_tokens(row['content'])
+            if used + cost > budget:
+                return recent, row['id']
+            recent.insert(0, row)
+            used += cost
+        if next_cursor is None:
+            return recent, None
+        cursor = next_cursor
+
+
+def _to_content(row):
+    role = "model" if row['role'] == "assistant" else "user"
+    return {"role": role, "parts": [row['content']]}
+
+
+def build_chat_context(user_id, summarize=gemini_summarizer, token_budget=CONTEXT_TOKEN_BUDGET,
+                       conversation_id=None):
+    """
+    Builds start_chat(history=...) contents for a returning user's conversation (default:
+    the current one) and returns (history, stats). stats reports the prompt tokens used
+    versus replaying everything.
+    """
+    if conversation_id is None:
+        conversation_id = db.current_conversation(user_id)
+    recent, cutoff_id = _select_recent(user_id, conversation_id, token_budget - SUMMARY_TOKEN_BUDGET)
+
+    summary = None
+    if cutoff_id is not None:
+        stored = db.get_chat_summary(conversation_id)
+        if stored and stored['upto_id'] >= cutoff_id:
+            # Stored summary already covers everything outside the window
+            summary = stored['summary']
+            recent = [row for row in recent if row['id'] > stored['upto_id']]
+        else:
+            after_id = stored['upto_id'] if stored else 0
+            previous = stored['summary'] if stored else ""
+            older = db.load_history_range(user_id, after_id, cutoff_id, conversation_id)
+            try:
+                summary = summarize(previous, older)
+            except Exception as e:
+                print(f"Summarizer failed, using extractive summary: {e}")
+                summary = extractive_summarizer(previous, older)
+            db.save_chat_summary(conversation_id, cutoff_id, summary)
+
+    history = []
+    if summary:
+        history.append({"role": "user", "parts": [f"Summary of our earlier conversation:\n{summary}"]})
+        # Gemini history user/model alternate kore, tai dorkar holei acknowledgement
+        if not recent or recent[0]['role'] == "user":
+            history.append({"role": "model", "parts": ["Understood, I'll keep that context in mind."]})
+    history += [_to_content(row) for row in recent]
+
+    message_count, total_chars = db.history_size(user_id, conversation_id)
+    full_tokens = total_chars // 4 + message_count
+    prompt_tokens = sum(estimate_tokens(part) for content in history for part in content["parts"])
+    stats = {
+        "messages": message_count,
+        "verbatim_messages": len(recent),
+        "summarized": summary is not None,
+        "full_tokens": full_tokens,
+        "prompt_tokens": prompt_tokens,
+        "saved_tokens": max(0, full_tokens - prompt_tokens),
+    }
+    return history, stats
@@ -1,169 +1,934 @@
 # database.py
 
+import os
 import sqlite3
-import bcrypt
-from datetime import datetime
+import threading
+import queue
+import atexit
+import time
+import hashlib
+import json
+import re
+import secrets
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from tracing import traced
 
 DATABASE_NAME = "users.db"
 
-# --- Database Connection ---
-def get_db_connection():
-    """Returns a connection to the SQLite database."""
-    conn = sqlite3.connect(DATABASE_NAME)
+# Chat page-e ek bar-e koto gulo message load hobe
+HISTORY_PAGE_SIZE = 50
+
+# Koto gulo idle connection pool-e rakha hobe (per process)
+POOL_SIZE = 8
+
+# Login token koto din valid thakbe (seconds)
+SESSION_TTL = 7 * 24 * 60 * 60
+# Browser-er token URL-e (?session=) thake, tai history ba share kora link theke
+# bhul haat-e jete pare; oi token-gulo kom shomoy valid ar protiti restore-e bodlay
+URL_SESSION_TTL = 12 * 60 * 60
+
+# OTP 10 minute valid, ar koto bar bhul try kora jabe
+OTP_TTL = 10 * 60
+OTP_MAX_ATTEMPTS = 5
+
+# Sidebar-e koto gulo recent conversation dekhano hobe
+CONVERSATION_LIST_SIZE = 10
+
+# Archived conversation eto din untouched thakle compress kore cold storage-e jay (0 = off).
+# app.py ar api_server.py .env load-er (tools package) aage database import kore, tai
+# env ta import-e na pore call-er shomoy pora hoy
+def cold_storage_days():
+    return int(os.getenv("COLD_STORAGE_DAYS", "0"))
+
+# Search result-e ek page-e koto gulo match
+SEARCH_PAGE_SIZE = 20
+
+# Write-behind queue: ek transaction-e max koto message, ar koto second por por flush hobe
+WRITE_BATCH_SIZE = 200
+WRITE_FLUSH_INTERVAL = 0.05
+# Turn-er shesh-e queued message commit-er jonno max koto second wait (confirm_messages)
+WRITE_CONFIRM_TIMEOUT = 10
+
+# --- Connection Pool ---
+# Protiti query-te notun connection khola ar schema check kora onek slow chilo.
+# Ekhon connection-gulo long-lived, pool theke borrow kore abar ferot deoa hoy.
+# sqlite3 protiti connection-e SQL text diye prepared statement cache kore rakhe,
+# tai same SQL string bar bar use korle statement re-use hoy.
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+# Pool contention bojhar jonno: koto bar borrow, koto bar pool khali chilo (notun connection)
+_pool_stats = {"borrowed": 0, "created": 0, "discarded": 0}
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def _new_connection():
+    """Opens a new tuned SQLite connection (WAL mode, relaxed fsync, statement cache)."""
+    conn = sqlite3.connect(
+        DATABASE_NAME,
+        timeout=30,
+        check_same_thread=False,  # Streamlit script run alada thread-e hoy
+        cached_statements=256,
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-8000")
     return conn
 
+@contextmanager
+def get_db_connection():
+    """Borrows a pooled connection to the SQLite database and returns it afterwards."""
+    init_db()
+    _pool_stats["borrowed"] += 1
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        _pool_stats["created"] += 1
+        conn = _new_connection()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            _pool_stats["discarded"] += 1
+            conn.close()
+
+def pool_stats():
+    """Connection pool counters; many 'created'/'discarded' means POOL_SIZE is too small."""
+    return dict(_pool_stats, idle=_pool.qsize(), size=POOL_SIZE)
+
+def close_all_connections():
+    """Closes every pooled connection (shutdown, or after changing DATABASE_NAME)."""
+    global _schema_ready
+    with _schema_lock:
+        while True:
+            try:
+                _pool.get_nowait().close()
+            except queue.Empty:
+                break
+        _schema_ready = False
+
 # --- Initialization Function ---
+def init_db():
+    """
+    Runs the schema bootstrap once per process. A failed bootstrap (e.g. "database is
+    locked" at startup) is retried on the next call instead of being marked done.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            _schema_ready = check_db_exists()
+
 def check_db_exists():
-    """Checks if the necessary tables exist, creates them, and ensures a demo user exists."""
-    conn = get_db_connection()
+    """
+    Checks if the necessary tables exist, creates them, and ensures a demo user exists.
+    Returns False if the schema could not be set up.
+    """
+    conn = _new_connection()
     cursor = conn.cursor()
-    
+
     try:
         # 1. Create Users Table (if not exists)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-        if cursor.fetchone() is None:
-            cursor.execute("""
-                CREATE TABLE users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    email TEXT NOT NULL UNIQUE,
-                    password_hash TEXT NOT NULL,
-                    created_at TIMESTAMP
-                )
-            """)
-
-        # 2. Create Chat History Table (if not exists)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chat_history'")
-        if cursor.fetchone() is None:
-            cursor.execute("""
-                CREATE TABLE chat_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    role TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    timestamp TIMESTAMP,
-                    FOREIGN KEY(user_id) REFERENCES users(id)
-                )
-            """)
-            
-        # 3. Create YOUR Permanent Demo User (FIXED)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                email TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                created_at TIMESTAMP
+            )
+        """)
+
+        # 2. Conversations: protiti "New Chat" ekta notun conversation, purono-gulo archive
+        # hoy (delete na). cold = message-gulo conversation_archive-e compressed ache.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                title TEXT,
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP,
+                archived INTEGER NOT NULL DEFAULT 0,
+                cold INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY(user_id) REFERENCES users(id)
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations (user_id, updated_at)"
+        )
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_archive (
+                conversation_id INTEGER PRIMARY KEY,
+                message_count INTEGER NOT NULL,
+                messages BLOB NOT NULL,
+                FOREIGN KEY(conversation_id) REFERENCES conversations(id)
+            )
+        """)
+
+        # 3. Create Chat History Table (if not exists)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chat_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TIMESTAMP,
+                conversation_id INTEGER,
+                FOREIGN KEY(user_id) REFERENCES users(id),
+                FOREIGN KEY(conversation_id) REFERENCES conversations(id)
+            )
+        """)
+        # Purono database-e conversation_id column chilo na
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(chat_history)")}
+        if "conversation_id" not in columns:
+            cursor.execute(
+                "ALTER TABLE chat_history ADD COLUMN conversation_id INTEGER REFERENCES conversations(id)"
+            )
+        # Conversation switch korle shudhu oi conversation-er page pora hoy
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_history_conversation_id "
+            "ON chat_history (conversation_id, id)"
+        )
+        # Per-user history lookup ar keyset pagination-er jonno composite index
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_history_user_id ON chat_history (user_id, id)"
+        )
+
+        # Full-text search index (FTS5). Contentless table, tai text duibar store hoy na;
+        # user_key ("u<id>") column diye index-er moddhei user filter hoy. Trigger-gulo
+        # chat_history-r shathe index sync rakhe.
+        fts_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chat_history_fts'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS chat_history_fts USING fts5(
+                content, user_key, content='', tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS chat_history_fts_insert AFTER INSERT ON chat_history BEGIN
+                INSERT INTO chat_history_fts (rowid, content, user_key)
+                VALUES (new.id, new.content, 'u' || new.user_id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS chat_history_fts_delete AFTER DELETE ON chat_history BEGIN
+                INSERT INTO chat_history_fts (chat_history_fts, rowid, content, user_key)
+                VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS chat_history_fts_update
+            AFTER UPDATE OF content, user_id ON chat_history BEGIN
+                INSERT INTO chat_history_fts (chat_history_fts, rowid, content, user_key)
+                VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+                INSERT INTO chat_history_fts (rowid, content, user_key)
+                VALUES (new.id, new.content, 'u' || new.user_id);
+            END
+        """)
+        if fts_exists is None:
+            # Purono database: ager message-gulo ekbar index-e tuli
+            cursor.execute(
+                "INSERT INTO chat_history_fts (rowid, content, user_key) "
+                "SELECT id, content, 'u' || user_id FROM chat_history"
+            )
+
+        # Ager flat history: protiti user-er shob message ekta "Earlier chat" conversation-e
+        orphans = cursor.execute(
+            "SELECT DISTINCT user_id FROM chat_history WHERE conversation_id IS NULL"
+        ).fetchall()
+        for (user_id,) in orphans:
+            now = datetime.now()
+            cursor.execute(
+                "INSERT INTO conversations (user_id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (user_id, "Earlier chat", now, now)
+            )
+            cursor.execute(
+                "UPDATE chat_history SET conversation_id = ? WHERE user_id = ? AND conversation_id IS NULL",
+                (cursor.lastrowid, user_id)
+            )
+
+        # Purono message-er rolling summary (context rehydration-er jonno), protibar login-e
+        # notun kore generate korte hoy na
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_summaries (
+                conversation_id INTEGER PRIMARY KEY,
+                upto_id INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                updated_at TIMESTAMP,
+                FOREIGN KEY(conversation_id) REFERENCES conversations(id)
+            )
+        """)
+        if cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chat_summaries'"
+        ).fetchone():
+            # Ager per-user summary: migration-er por protiti user-er ekta-i conversation
+            cursor.execute(
+                "INSERT OR IGNORE INTO conversation_summaries (conversation_id, upto_id, summary, updated_at) "
+                "SELECT c.id, s.upto_id, s.summary, s.updated_at FROM chat_summaries AS s "
+                "JOIN conversations AS c ON c.user_id = s.user_id"
+            )
+            cursor.execute("DROP TABLE chat_summaries")
+
+        # Login session token (shudhu SHA-256 hash store hoy, raw token na)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                token_hash TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                created_at TIMESTAMP,
+                expires_at REAL NOT NULL,
+                revoked INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY(user_id) REFERENCES users(id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+
+        # Signup/reset OTP (session state-e na rekhe DB-te, expiry shoho; code-er hash store hoy)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS otp_codes (
+                email TEXT NOT NULL,
+                purpose TEXT NOT NULL,
+                code_hash TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (email, purpose)
+            )
+        """)
+
+        # 4. Create YOUR Permanent Demo User (FIXED)
         cursor.execute("SELECT id FROM users WHERE email = 'yesai.dev@gmail.com'")
         if cursor.fetchone() is None:
             # Hash 'aidemo123' securely
+            import bcrypt
             password_bytes = 'aidemo123'.encode('utf-8')
             password_hash = bcrypt.hashpw(password_bytes, bcrypt.gensalt()).decode('utf-8')
-            
+
             cursor.execute(
                 "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
                 ('DemoUser', 'yesai.dev@gmail.com', password_hash, datetime.now())
             )
-            
+
         conn.commit()
+        return True
     except sqlite3.Error as e:
+        # Adha-kora migration rollback hoy; porer init_db() abar chesta kore
+        conn.rollback()
         print(f"Database Error during check/creation: {e}")
+        return False
     finally:
         conn.close()
 
-# (Rest of the User Management and Chat History functions are the same as before)
-
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+# --- User Management ---
 
+@traced("db.add_user")
 def add_user(username, email, password):
-    check_db_exists()
+    import bcrypt  # lazy: login page render-er shomoy bcrypt lage na
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         password_bytes = password.encode('utf-8')
         password_hash = bcrypt.hashpw(password_bytes, bcrypt.gensalt()).decode('utf-8')
-        cursor.execute("INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
-            (username, email, password_hash, datetime.now()))
-        conn.commit()
-        conn.close()
+        with get_db_connection() as conn, conn:
+            conn.execute("INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                (username, email, password_hash, datetime.now()))
         return True
     except sqlite3.IntegrityError:
-        conn.close()
         return False
     except Exception as e:
         print(f"Error adding user: {e}")
-        conn.close()
         return False
 
+@traced("db.check_email_exists")
 def check_email_exists(email):
-    check_db_exists()
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT email FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
-    conn.close()
+    with get_db_connection() as conn:
+        user = conn.execute("SELECT email FROM users WHERE email = ?", (email,)).fetchone()
     return user is not None
 
+@traced("db.check_user")
 def check_user(email, password):
-    check_db_exists()
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
-    conn.close()
+    import bcrypt
+    with get_db_connection() as conn:
+        user = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
     if user:
         password_hash = user['password_hash'].encode('utf-8')
         if bcrypt.checkpw(password.encode('utf-8'), password_hash):
             return user
     return None
 
+@traced("db.update_password")
 def update_password(email, new_password):
-    check_db_exists()
+    import bcrypt
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         password_bytes = new_password.encode('utf-8')
         password_hash = bcrypt.hashpw(password_bytes, bcrypt.gensalt()).decode('utf-8')
-        cursor.execute(
-            "UPDATE users SET password_hash = ?, created_at = ? WHERE email = ?",
-            (password_hash, datetime.now(), email))
-        conn.commit()
-        conn.close()
+        with get_db_connection() as conn, conn:
+            conn.execute(
+                "UPDATE users SET password_hash = ?, created_at = ? WHERE email = ?",
+                (password_hash, datetime.now(), email))
+            user = conn.execute("SELECT id FROM users WHERE email = ?", (email,)).fetchone()
+        # Password bodlale purono shob login session baatil
+        if user:
+            revoke_user_sessions(user['id'])
         return True
     except Exception as e:
         print(f"Error updating password: {e}")
         return False
 
-def save_message(user_id, role, content):
-    check_db_exists() 
+# --- Login Sessions ---
+# Browser refresh-e st.session_state muche jay; bar bar bcrypt verify (~100-300 ms CPU)
+# na kore opaque token diye ekta indexed query-te user-ke chine nei.
+
+def _hash_token(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+@traced("db.create_session")
+def create_session(user_id, ttl=SESSION_TTL):
+    """Creates a login session and returns the opaque token to hand to the client."""
+    token = secrets.token_urlsafe(32)
+    now = time.time()
+    with get_db_connection() as conn, conn:
+        # Meyad shesh howa row-gulo ekhanei muche jay, tai table login-er shathe barte thake na
+        conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "INSERT INTO sessions (token_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (_hash_token(token), user_id, datetime.now(), now + ttl))
+    return token
+
+@traced("db.get_session_user")
+def get_session_user(token):
+    """Returns the user row for a valid, unexpired, unrevoked token, or None."""
+    if not token:
+        return None
+    with get_db_connection() as conn:
+        return conn.execute(
+            "SELECT users.* FROM sessions JOIN users ON users.id = sessions.user_id "
+            "WHERE sessions.token_hash = ? AND sessions.revoked = 0 AND sessions.expires_at > ?",
+            (_hash_token(token), time.time())
+        ).fetchone()
+
+@traced("db.rotate_session")
+def rotate_session(token):
+    """
+    Swaps a valid token for a new one and revokes the old one, so a leaked copy stops
+    working once the owner comes back. The new token keeps the old expiry: rotating
+    never extends a session. Returns (user row, new token), or (None, None).
+    """
+    if not token:
+        return None, None
+    new_token = secrets.token_urlsafe(32)
+    with get_db_connection() as conn, conn:
+        session = conn.execute(
+            "SELECT user_id, expires_at FROM sessions WHERE token_hash = ? AND revoked = 0 AND expires_at > ?",
+            (_hash_token(token), time.time())
+        ).fetchone()
+        # Ek-i token diye duto restore ek-shathe hole shudhu ekta-i jite
+        if session is None or conn.execute(
+                "UPDATE sessions SET revoked = 1 WHERE token_hash = ? AND revoked = 0",
+                (_hash_token(token),)).rowcount != 1:
+            return None, None
+        conn.execute(
+            "INSERT INTO sessions (token_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (_hash_token(new_token), session['user_id'], datetime.now(), session['expires_at']))
+        user = conn.execute("SELECT * FROM users WHERE id = ?", (session['user_id'],)).fetchone()
+    return user, new_token
+
+@traced("db.revoke_session")
+def revoke_session(token):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO chat_history (user_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
-            (user_id, role, content, datetime.now()))
-        conn.commit()
-        conn.close()
+        with get_db_connection() as conn, conn:
+            conn.execute("UPDATE sessions SET revoked = 1 WHERE token_hash = ?", (_hash_token(token),))
+        return True
+    except Exception as e:
+        print(f"Error revoking session: {e}")
+        return False
+
+@traced("db.revoke_user_sessions")
+def revoke_user_sessions(user_id):
+    """Revokes every session of a user (e.g. after a password change) and drops expired rows."""
+    try:
+        with get_db_connection() as conn, conn:
+            conn.execute("UPDATE sessions SET revoked = 1 WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+        return True
+    except Exception as e:
+        print(f"Error revoking sessions: {e}")
+        return False
+
+# --- One-Time Passwords ---
+
+@traced("db.create_otp")
+def create_otp(email, purpose, ttl=OTP_TTL):
+    """Creates (or replaces) a 6-digit OTP for email/purpose and returns the code."""
+    otp = f"{secrets.randbelow(900000) + 100000}"
+    with get_db_connection() as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO otp_codes (email, purpose, code_hash, expires_at, attempts) "
+            "VALUES (?, ?, ?, ?, 0)", (email, purpose, _hash_token(otp), time.time() + ttl))
+    return otp
+
+@traced("db.verify_otp")
+def verify_otp(email, purpose, otp):
+    """Checks an OTP; a correct code is consumed, a wrong one counts against the attempt limit."""
+    with get_db_connection() as conn, conn:
+        row = conn.execute(
+            "SELECT code_hash, expires_at, attempts FROM otp_codes WHERE email = ? AND purpose = ?",
+            (email, purpose)
+        ).fetchone()
+        if row is None or row['expires_at'] <= time.time() or row['attempts'] >= OTP_MAX_ATTEMPTS:
+            return False
+        if not secrets.compare_digest(row['code_hash'], _hash_token((otp or "").strip())):
+            conn.execute(
+                "UPDATE otp_codes SET attempts = attempts + 1 WHERE email = ? AND purpose = ?",
+                (email, purpose))
+            return False
+        conn.execute("DELETE FROM otp_codes WHERE email = ? AND purpose = ?", (email, purpose))
+    return True
+
+# --- Conversations ---
+
+@traced("db.create_conversation")
+def create_conversation(user_id, title=None):
+    """Starts a new, empty conversation and returns its id."""
+    now = datetime.now()
+    with get_db_connection() as conn, conn:
+        cursor = conn.execute(
+            "INSERT INTO conversations (user_id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (user_id, title, now, now))
+    return cursor.lastrowid
+
+@traced("db.current_conversation")
+def current_conversation(user_id):
+    """Id of the user's most recently used open conversation; one is created if there is none."""
+    with get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT id FROM conversations WHERE user_id = ? AND archived = 0 "
+            "ORDER BY updated_at DESC, id DESC LIMIT 1", (user_id,)
+        ).fetchone()
+    return row['id'] if row else create_conversation(user_id)
+
+@traced("db.list_conversations")
+def list_conversations(user_id, limit=CONVERSATION_LIST_SIZE):
+    """The user's conversations, most recently used first (id, title, updated_at, archived, cold)."""
+    _flush_if_pending()
+    with get_db_connection() as conn:
+        return conn.execute(
+            "SELECT id, title, updated_at, archived, cold FROM conversations WHERE user_id = ? "
+            "ORDER BY updated_at DESC, id DESC LIMIT ?", (user_id, limit)
+        ).fetchall()
+
+@traced("db.archive_conversation")
+def archive_conversation(user_id, conversation_id):
+    """Closes a conversation (New Chat). Its messages stay stored and searchable."""
+    with get_db_connection() as conn, conn:
+        conn.execute(
+            "UPDATE conversations SET archived = 1 WHERE id = ? AND user_id = ?",
+            (conversation_id, user_id))
+
+@traced("db.open_conversation")
+def open_conversation(user_id, conversation_id):
+    """
+    Reopens one of the user's conversations, restoring its messages from cold storage
+    if needed. Returns False if the conversation does not belong to the user.
+    """
+    with get_db_connection() as conn, conn:
+        row = conn.execute(
+            "SELECT cold FROM conversations WHERE id = ? AND user_id = ?", (conversation_id, user_id)
+        ).fetchone()
+        if row is None:
+            return False
+        if row['cold']:
+            archived = conn.execute(
+                "SELECT messages FROM conversation_archive WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+            if archived is not None:
+                # Original id-gulo abar bosai (AUTOINCREMENT id reuse kore na), tai order ar cursor thik thake
+                conn.executemany(
+                    "INSERT OR IGNORE INTO chat_history (id, user_id, role, content, timestamp, conversation_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(*message, conversation_id) for message in json.loads(zlib.decompress(archived['messages']))])
+                conn.execute("DELETE FROM conversation_archive WHERE conversation_id = ?", (conversation_id,))
+        conn.execute(
+            "UPDATE conversations SET archived = 0, cold = 0 WHERE id = ?", (conversation_id,))
+    return True
+
+@traced("db.owns_conversation")
+def owns_conversation(user_id, conversation_id):
+    """Read-only check that the conversation belongs to the user; unlike open_conversation() it changes nothing."""
+    with get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM conversations WHERE id = ? AND user_id = ?", (conversation_id, user_id)
+        ).fetchone()
+    return row is not None
+
+@traced("db.compress_stale_conversations")
+def compress_stale_conversations(user_id=None, days=None, vacuum=False):
+    """
+    Moves archived conversations untouched for `days` days (default: COLD_STORAGE_DAYS
+    from the environment) into conversation_archive as one zlib-compressed blob each
+    and deletes their chat_history rows (and FTS entries).
+    Limited to one user when user_id is given. vacuum=True also shrinks the database file.
+    Returns the number of conversations moved; open_conversation() brings one back.
+    """
+    if days is None:
+        days = cold_storage_days()
+    if days <= 0:
+        return 0
+    _flush_if_pending()
+    query = "SELECT id FROM conversations WHERE archived = 1 AND cold = 0 AND updated_at < ?"
+    params = [datetime.now() - timedelta(days=days)]
+    if user_id is not None:
+        query += " AND user_id = ?"
+        params.append(user_id)
+
+    moved = 0
+    with get_db_connection() as conn:
+        for (conversation_id,) in conn.execute(query, params).fetchall():
+            with conn:
+                rows = conn.execute(
+                    "SELECT id, user_id, role, content, timestamp FROM chat_history "
+                    "WHERE conversation_id = ? ORDER BY id", (conversation_id,)
+                ).fetchall()
+                blob = zlib.compress(json.dumps([list(row) for row in rows], default=str).encode("utf-8"), 9)
+                conn.execute(
+                    "INSERT OR REPLACE INTO conversation_archive (conversation_id, message_count, messages) "
+                    "VALUES (?, ?, ?)", (conversation_id, len(rows), blob))
+                conn.execute("DELETE FROM chat_history WHERE conversation_id = ?", (conversation_id,))
+                conn.execute("UPDATE conversations SET cold = 1 WHERE id = ?", (conversation_id,))
+            moved += 1
+        if vacuum and moved:
+            conn.execute("VACUUM")
+    return moved
+
+# --- Chat History ---
+# conversation_id na dile user-er current conversation (current_conversation) use hoy
+
+@traced("db.save_message")
+def save_message(user_id, role, content, conversation_id=None):
+    try:
+        if conversation_id is None:
+            conversation_id = current_conversation(user_id)
+        now = datetime.now()
+        with get_db_connection() as conn, conn:
+            conn.execute(
+                "INSERT INTO chat_history (user_id, role, content, timestamp, conversation_id) "
+                "VALUES (?, ?, ?, ?, ?)", (user_id, role, content, now, conversation_id))
+            _touch_conversations(conn, [(user_id, role, content, now, conversation_id)])
         return True
     except Exception as e:
         print(f"Error saving message: {e}")
         return False
 
-def load_history(user_id):
-    check_db_exists() 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT role, content FROM chat_history WHERE user_id = ? ORDER BY id", (user_id,))
-    history = cursor.fetchall()
-    conn.close()
+@traced("db.load_history")
+def load_history(user_id, conversation_id=None):
+    if conversation_id is None:
+        conversation_id = current_conversation(user_id)
+    _flush_if_pending()
+    with get_db_connection() as conn:
+        history = conn.execute(
+            "SELECT role, content FROM chat_history WHERE conversation_id = ? AND user_id = ? ORDER BY id",
+            (conversation_id, user_id)
+        ).fetchall()
     return history
 
+@traced("db.load_history_page")
+def load_history_page(user_id, limit=HISTORY_PAGE_SIZE, before_id=None, conversation_id=None):
+    """
+    Returns one page of a conversation (oldest first) and a cursor for the next older page.
+    Pass the returned cursor as before_id to load older messages; it is None when nothing is left.
+    """
+    if conversation_id is None:
+        conversation_id = current_conversation(user_id)
+    _flush_if_pending()
+    with get_db_connection() as conn:
+        if before_id is None:
+            rows = conn.execute(
+                "SELECT id, role, content FROM chat_history WHERE conversation_id = ? AND user_id = ? "
+                "ORDER BY id DESC LIMIT ?", (conversation_id, user_id, limit + 1)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT id, role, content FROM chat_history WHERE conversation_id = ? AND user_id = ? "
+                "AND id < ? ORDER BY id DESC LIMIT ?", (conversation_id, user_id, before_id, limit + 1)
+            ).fetchall()
+
+    # Ekta extra row fetch kore bujhi aro purono message ache kina
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    next_cursor = rows[0]['id'] if has_more and rows else None
+    return rows, next_cursor
+
+@traced("db.load_history_range")
+def load_history_range(user_id, after_id, upto_id, conversation_id=None):
+    """Returns the conversation's messages with after_id < id <= upto_id, oldest first."""
+    if conversation_id is None:
+        conversation_id = current_conversation(user_id)
+    _flush_if_pending()
+    with get_db_connection() as conn:
+        return conn.execute(
+            "SELECT id, role, content FROM chat_history WHERE conversation_id = ? AND user_id = ? "
+            "AND id > ? AND id <= ? ORDER BY id", (conversation_id, user_id, after_id, upto_id)
+        ).fetchall()
+
+@traced("db.history_size")
+def history_size(user_id, conversation_id=None):
+    """Returns (message count, total characters) of a stored conversation."""
+    if conversation_id is None:
+        conversation_id = current_conversation(user_id)
+    _flush_if_pending()
+    with get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM chat_history "
+            "WHERE conversation_id = ? AND user_id = ?", (conversation_id, user_id)
+        ).fetchone()
+    return row[0], row[1]
+
+def _fts_query(query):
+    """
+    Turns free text into a safe FTS5 expression: every word must match, the last one
+    as a prefix (search-as-you-type). Returns None when there is nothing to search for.
+    """
+    terms = re.findall(r"\w+", query or "")
+    if not terms:
+        return None
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += "*"
+    return " AND ".join(phrases)
+
+@traced("db.search_history")
+def search_history(user_id, query, limit=SEARCH_PAGE_SIZE, offset=0):
+    """
+    Full-text search over a user's history, best matches first (BM25).
+    Returns (rows of id, role, content, timestamp, conversation_id, next_offset); next_offset
+    is None on the last page. Conversations in cold storage are not searched.
+    """
+    match = _fts_query(query)
+    if match is None:
+        return [], None
+    _flush_if_pending()
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            "SELECT h.id, h.role, h.content, h.timestamp, h.conversation_id FROM chat_history_fts "
+            "JOIN chat_history AS h ON h.id = chat_history_fts.rowid "
+            "WHERE chat_history_fts MATCH ? ORDER BY chat_history_fts.rank LIMIT ? OFFSET ?",
+            (f'user_key : "u{int(user_id)}" AND content : ({match})', limit + 1, offset)
+        ).fetchall()
+    has_more = len(rows) > limit
+    return rows[:limit], offset + limit if has_more else None
+
+@traced("db.get_chat_summary")
+def get_chat_summary(conversation_id):
+    """Returns the conversation's stored rolling summary row (upto_id, summary) or None."""
+    with get_db_connection() as conn:
+        return conn.execute(
+            "SELECT upto_id, summary FROM conversation_summaries WHERE conversation_id = ?",
+            (conversation_id,)
+        ).fetchone()
+
+@traced("db.save_chat_summary")
+def save_chat_summary(conversation_id, upto_id, summary):
+    try:
+        with get_db_connection() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO conversation_summaries (conversation_id, upto_id, summary, updated_at) "
+                "VALUES (?, ?, ?, ?)", (conversation_id, upto_id, summary, datetime.now()))
+        return True
+    except Exception as e:
+        print(f"Error saving chat summary: {e}")
+        return False
+
+@traced("db.clear_history")
 def clear_history(user_id):
-    check_db_exists() 
+    """Permanently deletes all of a user's conversations (New Chat archives instead)."""
+    _flush_if_pending()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        with get_db_connection() as conn, conn:
+            conversations = "SELECT id FROM conversations WHERE user_id = ?"
+            conn.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
+            conn.execute(f"DELETE FROM conversation_summaries WHERE conversation_id IN ({conversations})", (user_id,))
+            conn.execute(f"DELETE FROM conversation_archive WHERE conversation_id IN ({conversations})", (user_id,))
+            conn.execute("DELETE FROM conversations WHERE user_id = ?", (user_id,))
         return True
     except Exception as e:
         print(f"Error clearing history: {e}")
-        return False
\ No newline at end of file
+        return False
+
+# --- Write-behind Message Queue ---
+# Chat turn-e UI thread jate fsync-er jonno block na hoy, message-gulo queue-te
+# rakha hoy ar ekta background thread batch kore ek transaction-e likhe dey.
+
+class MessageTicket:
+    """Acknowledgement for a queued message; wait() returns True once it is committed."""
+
+    def __init__(self, message=None):
+        self._event = threading.Event()
+        self.ok = None
+        # (user_id, role, content, conversation_id), writer fail korle abar save korar jonno
+        self.message = message
+
+    def _resolve(self, ok):
+        self.ok = ok
+        self._event.set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout) and self.ok
+
+_write_queue = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_thread = None
+_pending_writes = 0
+_FLUSH = object()
+_STOP = object()
+
+def queue_message(user_id, role, content, conversation_id=None):
+    """Queues a chat message for batched insertion and returns its MessageTicket."""
+    global _pending_writes
+    if conversation_id is None:
+        conversation_id = current_conversation(user_id)
+    _start_writer()
+    ticket = MessageTicket((user_id, role, content, conversation_id))
+    with _writer_lock:
+        _pending_writes += 1
+    _write_queue.put((user_id, role, content, datetime.now(), conversation_id, ticket))
+    return ticket
+
+@traced("db.confirm_messages")
+def confirm_messages(tickets, timeout=WRITE_CONFIRM_TIMEOUT):
+    """
+    Waits for queued messages to be committed. A message the writer gave up on is
+    saved directly with save_message(). Returns False if a message could not be
+    saved or was still unconfirmed after timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    saved = True
+    for ticket in tickets:
+        if ticket.wait(max(0.0, deadline - time.monotonic())):
+            continue
+        if ticket.ok is None:
+            # Writer ekhono likhche; ekhane abar likhle message duibar save hote pare
+            print(f"Queued message not confirmed within {timeout}s")
+            saved = False
+        elif not save_message(*ticket.message):
+            saved = False
+    return saved
+
+@traced("db.flush_messages")
+def flush_messages(timeout=None):
+    """Blocks until every message queued before this call is written. Returns True on success."""
+    if _writer_thread is None:
+        return True
+    marker = MessageTicket()
+    _write_queue.put((_FLUSH, marker))
+    return marker.wait(timeout)
+
+def _flush_if_pending():
+    # Read-your-writes: history porar age queue-te thaka message-gulo commit kore nei
+    if _pending_writes:
+        flush_messages()
+
+def _start_writer():
+    global _writer_thread
+    if _writer_thread is not None:
+        return
+    with _writer_lock:
+        if _writer_thread is None:
+            thread = threading.Thread(target=_writer_loop, name="chat-history-writer", daemon=True)
+            thread.start()
+            _writer_thread = thread
+            atexit.register(shutdown_writer)
+
+def shutdown_writer(timeout=5):
+    """Flushes the queue and stops the background writer (also runs at interpreter exit)."""
+    global _writer_thread
+    thread = _writer_thread
+    if thread is None:
+        return
+    _write_queue.put((_STOP, None))
+    thread.join(timeout)
+    _writer_thread = None
+
+def _touch_conversations(conn, rows):
+    # Conversation-er updated_at bump, ar title na thakle prothom user message theke
+    touched = {}
+    for user_id, role, content, timestamp, conversation_id in rows:
+        title = touched.get(conversation_id, (None, None))[1]
+        if title is None and role == "user":
+            title = " ".join(content.split())[:60]
+        touched[conversation_id] = (timestamp, title)
+    conn.executemany(
+        "UPDATE conversations SET updated_at = ?, title = COALESCE(title, ?) WHERE id = ?",
+        [(timestamp, title, conversation_id) for conversation_id, (timestamp, title) in touched.items()])
+
+@traced("db.write_batch")
+def _write_batch(batch):
+    global _pending_writes
+    rows = [item[:5] for item in batch]
+    ok = False
+    for attempt in range(3):
+        try:
+            with get_db_connection() as conn, conn:
+                conn.executemany(
+                    "INSERT INTO chat_history (user_id, role, content, timestamp, conversation_id) "
+                    "VALUES (?, ?, ?, ?, ?)", rows)
+                _touch_conversations(conn, rows)
+            ok = True
+            break
+        except Exception as e:
+            print(f"Error saving message batch (attempt {attempt + 1}): {e}")
+            time.sleep(0.1 * (attempt + 1))
+    with _writer_lock:
+        _pending_writes -= len(batch)
+    for item in batch:
+        item[5]._resolve(ok)
+    return ok
+
+def _writer_loop():
+    while True:
+        item = _write_queue.get()
+        batch, markers, stop = [], [], False
+        deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+        while True:
+            if item[0] is _STOP:
+                stop = True
+            elif item[0] is _FLUSH:
+                markers.append(item[1])
+            else:
+                batch.append(item)
+            # Flush marker ba stop ele ar wait kori na, shathe shathe likhe dei
+            if stop or markers or len(batch) >= WRITE_BATCH_SIZE:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+        ok = _write_batch(batch) if batch else True
+        for marker in markers:
+            marker._resolve(ok)
+        if stop:
+            # Stop-er por aro kichu queue-te eshe thakle seta o likhe di
+            leftover, late_markers = [], []
+            while True:
+                try:
+                    item = _write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item[0] is _FLUSH:
+                    late_markers.append(item[1])
+                elif item[0] is not _STOP:
+                    leftover.append(item)
+            ok = _write_batch(leftover) if leftover else True
+            for marker in late_markers:
+                marker._resolve(ok)
+            return
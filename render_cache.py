@@ -0,0 +1,85 @@
+# render_cache.py
+
+# Chat page-er purono message-gulo protiti full rerun-e abar markdown hishebe dekhano
+# hoy. Message-er display markdown (trim, dam-er "$" escape) content-er hash diye
+# ekhane cache hoy, tai boro history-te protibar ek-i kaj abar hoy na.
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "5000"))
+
+# Streamlit "$...$"-ke LaTeX dhore, tai "$5 theke $10" bhul render hoy; shudhu
+# number-er aager "$" escape kora hoy, "$x^2$" math hishebei thake
+_CURRENCY_DOLLAR = re.compile(r"(?<!\\)\$(?=\d)")
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _content_key(content: str) -> bytes:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+def prepare_markdown(content: str) -> str:
+    """Turns a stored chat message into the markdown shown in the chat (uncached)."""
+    return _CURRENCY_DOLLAR.sub(r"\\$", content.strip())
+
+
+def markdown_stream(chunks, raw=None):
+    """
+    prepare_markdown()'s "$" escaping for an answer being streamed, so it renders the
+    same while streaming as after the next rerun. The unescaped chunks are appended to
+    raw (a list), since that text, not the displayed one, is what gets saved.
+    """
+    previous = ""  # Ager chunk-er shesh character, regex-er lookbehind-er jonno
+    pending = ""
+    for chunk in chunks:
+        if raw is not None:
+            raw.append(chunk)
+        text = pending + chunk
+        # Shesh-er "$"-er por digit ache kina porer chunk na ele bojha jay na
+        pending = "$" if text.endswith("$") else ""
+        text = text[:len(text) - len(pending)]
+        if text:
+            yield _CURRENCY_DOLLAR.sub(r"\\$", previous + text)[len(previous):]
+            previous = text[-1]
+    if pending:
+        yield pending
+
+
+def markdown_body(content: str) -> str:
+    """prepare_markdown() cached by a hash of the content; shared by every session."""
+    key = _content_key(content)
+    with _lock:
+        body = _cache.get(key)
+        if body is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return body
+        _stats["misses"] += 1
+
+    body = prepare_markdown(content)
+    with _lock:
+        _cache[key] = body
+        while len(_cache) > RENDER_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return body
+
+
+def stats() -> dict:
+    with _lock:
+        stats = dict(_stats, size=len(_cache))
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
@@ -0,0 +1,80 @@
+# response_cache.py
+
+# Onek user ek-i non-personal prompt pathay ("latest news", "weather in Delhi").
+# Prothom turn-er (context chara) emon prompt-er answer ekhane cache hoy, jate
+# protibar Gemini round-trip ar tool call na lage. Opt-in: RESPONSE_CACHE_ENABLED=1.
+
+import os
+import re
+
+from tools.cache import TTLCache, normalize_key
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "0") == "1"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "500"))
+# Er cheye boro answer cache hoy na, tai memory max ~ SIZE x MAX_CHARS
+RESPONSE_CACHE_MAX_CHARS = int(os.getenv("RESPONSE_CACHE_MAX_CHARS", "8000"))
+
+# Kon tool use holo tar upor answer koto khon fresh thakbe (seconds); shob-cheye choto-ta nei
+TOOL_TTLS = {
+    "get_weather": 10 * 60,
+    "get_latest_news": 15 * 60,
+    "deep_research": 6 * 60 * 60,
+    "solve_math": 24 * 60 * 60,
+}
+NO_TOOL_TTL = 60 * 60
+
+# Personal prompt ("my", "I", "amar", "mera" ...) kokhono cache hoy na. Hindi "main" shudhu
+# hindi shobder age dhora hoy ("main causes of inflation" personal na), ar "us" case-sensitive,
+# jate "US election news" na dhore
+_PERSONAL = re.compile(
+    r"\b(i|me|my|mine|myself|we|our|ami|amar|amake|mera|meri|mujhe|hum|hamara"
+    r"|main (?:hoon|hun|kya|kaise|kab|kahan|bhi|apna|apni|apne|chahta|chahti))\b",
+    re.IGNORECASE,
+)
+_PERSONAL_US = re.compile(r"\b[uU]s\b")
+_BENGALI = re.compile(r"[\u0980-\u09FF]")
+_DEVANAGARI = re.compile(r"[\u0900-\u097F]")
+
+_cache = TTLCache(ttl=NO_TOOL_TTL, maxsize=RESPONSE_CACHE_SIZE)
+
+
+def detect_language(text: str) -> str:
+    if _BENGALI.search(text):
+        return "bn"
+    if _DEVANAGARI.search(text):
+        return "hi"
+    return "en"
+
+
+def _key(prompt: str, research_mode: bool) -> str:
+    return f"{detect_language(prompt)}|{int(research_mode)}|{normalize_key(prompt)}"
+
+
+def is_personal(prompt: str) -> bool:
+    """True if the prompt talks about the user (personal pronouns), so its answer is not shared."""
+    return bool(_PERSONAL.search(prompt) or _PERSONAL_US.search(prompt))
+
+
+def is_cacheable(chat, prompt: str) -> bool:
+    """Only opt-in, first-turn (no chat history) and non-personal prompts use the cache."""
+    if not RESPONSE_CACHE_ENABLED or is_personal(prompt):
+        return False
+    return not list(getattr(chat, "history", None) or [])
+
+
+def lookup(prompt: str, research_mode: bool = False):
+    """Returns a fresh cached answer or None; counts a hit or miss."""
+    return _cache.lookup(_key(prompt, research_mode))
+
+
+def store(prompt: str, research_mode: bool, answer: str, tools_used=()):
+    """Caches an answer for the shortest freshness TTL among the tools it used."""
+    if not answer or len(answer) > RESPONSE_CACHE_MAX_CHARS:
+        return
+    ttl = min((TOOL_TTLS.get(name, NO_TOOL_TTL) for name in tools_used), default=NO_TOOL_TTL)
+    _cache.set(_key(prompt, research_mode), answer, ttl=ttl)
+
+
+def stats() -> dict:
+    """Hit/miss counters, hit rate and current size."""
+    return _cache.stats()
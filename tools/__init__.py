@@ -0,0 +1,5 @@
+# tools/__init__.py
+# .env file-ta ekhane ekbar-i load hoy; protiti tool module alada kore load_dotenv() call kore na.
+from dotenv import load_dotenv
+
+load_dotenv()
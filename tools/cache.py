@@ -0,0 +1,108 @@
+# tools/cache.py
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_key(text: str) -> str:
+    """Folds case, whitespace and diacritics so 'São  Paulo' and 'sao paulo' share one key."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache with a time-to-live and stale-while-revalidate.
+
+    An entry younger than `ttl` seconds is a fresh hit. An entry that is older, but
+    still within `ttl + stale_ttl`, is served immediately while one background thread
+    reloads it. Anything older is a miss and is loaded synchronously. set() can give
+    a single entry its own ttl.
+    """
+
+    def __init__(self, ttl, maxsize=256, stale_ttl=0, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def get(self, key, allow_stale=False):
+        """Returns the cached value or None, without loading anything."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            age = self._clock() - entry[1]
+            if age < entry[2] or (allow_stale and age < entry[2] + self.stale_ttl):
+                self._data.move_to_end(key)
+                return entry[0]
+            return None
+
+    def lookup(self, key):
+        """Like get(), but counts the lookup as a hit or miss in stats()."""
+        value = self.get(key)
+        with self._lock:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, self._clock(), self.ttl if ttl is None else ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Returns the value for key, calling loader() on a miss. Loader errors are not cached."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                age = self._clock() - entry[1]
+                if age < entry[2]:
+                    self._stats["hits"] += 1
+                    self._data.move_to_end(key)
+                    return entry[0]
+                if age < entry[2] + self.stale_ttl:
+                    self._stats["stale_hits"] += 1
+                    self._data.move_to_end(key)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return entry[0]
+            self._stats["misses"] += 1
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def _refresh(self, key, loader):
+        try:
+            value = loader()
+            self.set(key, value)
+            with self._lock:
+                self._stats["refreshes"] += 1
+        except Exception as e:
+            print(f"Cache refresh failed for '{key}': {e}")
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._data)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,97 @@
+# tools/data/build_gazetteer.py
+# tools/gazetteer.py-r data file-gulo GeoNames-er city list theke toiri kore. GeoNames
+# data geonamescache package-e JSON hishebe ashe (pip download geonamescache, wheel-ta
+# unzip). Data abar toiri korte:
+#
+#   python tools/data/build_gazetteer.py path/to/geonamescache/data
+#
+# Output (shob UTF-8, line-sorted, jate gazetteer mmap kore binary search korte pare):
+#   cities.tsv      id, name, country, lat, lon, population   (id order-e)
+#   city_names.tsv  normalized name/alias -> ids, boro shohor aage   (key-er byte order-e)
+#   countries.tsv   normalized country name / ISO code -> ISO2 code
+
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from tools.cache import normalize_key  # noqa: E402
+
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Ei desh-gulor chhoto shohor-o (5000+) ar tader alias rakha hoy; baki duniya 15000+
+REGIONAL_COUNTRIES = {"IN", "BD", "NP", "LK", "BT"}
+MIN_POPULATION = 15000
+MIN_REGIONAL_POPULATION = 5000
+# Er cheye boro shohor-er alias ("Calcutta", "Bombay") rakha hoy
+MIN_ALIAS_POPULATION = 100000
+
+# App English, Bengali ar Hindi bujhe, tai Latin, Bengali ar Devanagari alias rakhi
+_LATIN_KEY = re.compile(r"^[a-z][a-z .'\-()]*$")
+_INDIC = re.compile(r"[ऀ-ॿঀ-৿]")
+# "CCU", "BOM": airport/place code, asol shohorer naam-er shathe gulie jay
+_CODE = re.compile(r"^[A-Z]{2,4}$")
+
+# Lok-mukhe chole emon country naam ja GeoNames-e nei
+EXTRA_COUNTRIES = {"uk": "GB", "england": "GB", "britain": "GB", "usa": "US", "america": "US", "uae": "AE"}
+
+
+def _names(city, with_aliases):
+    names = {normalize_key(city["name"])}
+    if with_aliases:
+        for alias in city["alternatenames"]:
+            if _CODE.match(alias):
+                continue
+            key = normalize_key(alias)
+            if _LATIN_KEY.match(key) or _INDIC.search(alias):
+                names.add(key)
+    names.discard("")
+    return names
+
+
+def build(source_dir, output_dir=OUTPUT_DIR):
+    with open(os.path.join(source_dir, "cities5000.json"), encoding="utf-8") as f:
+        cities = json.load(f).values()
+    with open(os.path.join(source_dir, "countries.json"), encoding="utf-8") as f:
+        countries = json.load(f).values()
+
+    kept = [
+        city for city in cities
+        if city["population"] >= (MIN_REGIONAL_POPULATION if city["countrycode"] in REGIONAL_COUNTRIES
+                                  else MIN_POPULATION)
+    ]
+    kept.sort(key=lambda city: city["geonameid"])
+
+    names = {}
+    for city in sorted(kept, key=lambda city: -city["population"]):
+        with_aliases = city["population"] >= MIN_ALIAS_POPULATION or city["countrycode"] in REGIONAL_COUNTRIES
+        for key in _names(city, with_aliases):
+            names.setdefault(key, []).append(city["geonameid"])
+
+    with open(os.path.join(output_dir, "cities.tsv"), "w", encoding="utf-8", newline="\n") as f:
+        for city in kept:
+            name = " ".join(city["name"].split())
+            f.write(f"{city['geonameid']}\t{name}\t{city['countrycode']}\t"
+                    f"{city['latitude']:.4f}\t{city['longitude']:.4f}\t{city['population']}\n")
+
+    with open(os.path.join(output_dir, "city_names.tsv"), "w", encoding="utf-8", newline="\n") as f:
+        for key in sorted(names, key=lambda key: key.encode("utf-8")):
+            f.write(f"{key}\t{','.join(map(str, names[key]))}\n")
+
+    country_keys = dict(EXTRA_COUNTRIES)
+    for country in countries:
+        for key in (country["name"], country["iso"], country["iso3"]):
+            country_keys.setdefault(normalize_key(key), country["iso"])
+    with open(os.path.join(output_dir, "countries.tsv"), "w", encoding="utf-8", newline="\n") as f:
+        for key in sorted(country_keys):
+            f.write(f"{key}\t{country_keys[key]}\n")
+
+    print(f"{len(kept)} cities, {len(names)} names, {len(country_keys)} country keys")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python tools/data/build_gazetteer.py path/to/geonamescache/data")
+    build(sys.argv[1])
@@ -1,22 +1,27 @@
 # tools/email_tool.py
 import os
-import smtplib
-import ssl
+import itertools
+import queue
 import random
-from dotenv import load_dotenv
-
-load_dotenv()
+import threading
+import time
+from collections import OrderedDict
 
 SENDER_EMAIL = os.getenv("EMAIL_ADDRESS")
 SENDER_PASSWORD = os.getenv("EMAIL_PASSWORD")
 
-def send_otp_email(receiver_email: str) -> str:
-    """Generates a 6-digit OTP and sends it to the user's email."""
-
-    # Generate a random 6-digit OTP
-    otp = str(random.randint(100000, 999999))
+# Local test-er jonno (aiosmtpd stand-in) host/port/SSL env diye bodlano jay
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "1") == "1"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "15"))
+# Eto second kono mail na thakle connection bondho kori (server nije-o idle connection kete dey)
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+# Koto gulo job-er delivery status mone rakha hobe
+OUTBOX_STATUS_LIMIT = 1000
 
-    message = f"""\
+def build_otp_message(otp: str) -> str:
+    return f"""\
 Subject: Your OTP for YES Ai
 
 Welcome to YES Ai
@@ -32,16 +37,116 @@ Regards,
 YES Ai Team
 """
 
-    context = ssl.create_default_context()
+# --- Background Outbox ---
+# Form-gulo mail pathanor jonno wait kore na: message queue-te rakhe shathe shathe
+# return kore. Ekta worker thread ekta authenticated SMTP connection khola rekhe
+# shob mail pathay, connection drop hole abar connect kore.
+
+_outbox = queue.Queue()
+_status = OrderedDict()
+_status_lock = threading.Lock()
+_job_ids = itertools.count(1)
+_worker = None
+_worker_lock = threading.Lock()
+
+def _set_status(job_id, status):
+    with _status_lock:
+        _status[job_id] = status
+        _status.move_to_end(job_id)
+        while len(_status) > OUTBOX_STATUS_LIMIT:
+            _status.popitem(last=False)
+
+def enqueue_email(receiver_email: str, message: str) -> int:
+    """Queues an email for the background sender and returns its job id."""
+    _start_worker()
+    job_id = next(_job_ids)
+    _set_status(job_id, "queued")
+    _outbox.put((job_id, receiver_email, message))
+    return job_id
+
+def enqueue_otp_email(receiver_email: str, otp: str) -> int:
+    """Queues the OTP email and returns its job id (see delivery_status)."""
+    return enqueue_email(receiver_email, build_otp_message(otp))
+
+def delivery_status(job_id) -> str:
+    """'queued', 'sending', 'sent', 'failed' or 'unknown'."""
+    with _status_lock:
+        return _status.get(job_id, "unknown")
+
+def wait_for_delivery(job_id, timeout=30.0, poll=0.05) -> str:
+    """Blocks until the job is sent or failed (or timeout) and returns its status."""
+    deadline = time.monotonic() + timeout
+    status = delivery_status(job_id)
+    while status in ("queued", "sending") and time.monotonic() < deadline:
+        time.sleep(poll)
+        status = delivery_status(job_id)
+    return status
 
+def _start_worker():
+    global _worker
+    if _worker is not None:
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_outbox_loop, name="smtp-outbox", daemon=True)
+            _worker.start()
+
+def _connect():
+    # smtplib/ssl import-e ~50 ms lage, tai login page-er jonno eta lazy
+    import smtplib
+    import ssl
+
+    if SMTP_USE_SSL:
+        server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT,
+                                  context=ssl.create_default_context())
+    else:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    if SENDER_PASSWORD:
+        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+    return server
+
+def _close(server):
     try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, receiver_email, message)
+        server.quit()
+    except Exception:
+        pass
+
+def _outbox_loop():
+    server = None
+    while True:
+        try:
+            job_id, receiver_email, message = _outbox.get(timeout=SMTP_IDLE_TIMEOUT)
+        except queue.Empty:
+            if server is not None:
+                _close(server)
+                server = None
+            continue
+
+        _set_status(job_id, "sending")
+        sent = False
+        # Purono connection drop hoye thakle ekbar reconnect kore abar try
+        for attempt in range(2):
+            try:
+                if server is None:
+                    server = _connect()
+                server.sendmail(SENDER_EMAIL or "", receiver_email, message)
+                sent = True
+                break
+            except Exception as e:
+                print(f"Failed to send email (attempt {attempt + 1}): {e}")
+                if server is not None:
+                    _close(server)
+                    server = None
+        _set_status(job_id, "sent" if sent else "failed")
+
+def send_otp_email(receiver_email: str) -> str:
+    """Generates a 6-digit OTP and sends it to the user's email."""
+
+    # Generate a random 6-digit OTP
+    otp = str(random.randint(100000, 999999))
 
+    # Outbox diye pathano hoy (pooled connection), kintu ei function delivery porjonto wait kore
+    if wait_for_delivery(enqueue_otp_email(receiver_email, otp)) == "sent":
         # Shudhu OTP-ta return kora hocche jate amra pore verify korte pari
         return otp
-
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-        return "Failed to send OTP"
\ No newline at end of file
+    return "Failed to send OTP"
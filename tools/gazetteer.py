@@ -0,0 +1,174 @@
+# tools/gazetteer.py
+# Model ja city string dey ("kolkata", "Calcutta", "Kolkata, IN", "Kolkatta") seta ekta
+# canonical GeoNames city-te map kore, network chara. Data tools/data-te line-sorted
+# TSV (build_gazetteer.py dekho); file-gulo prothom lookup-e mmap hoy ar binary search
+# hoy, tai startup-e kichu load hoy na ar memory-te shudhu chhoa page-gulo thake.
+import difflib
+import functools
+import mmap
+import os
+import threading
+from collections import namedtuple
+
+from tools.cache import normalize_key
+
+GAZETTEER_DIR = os.getenv("GAZETTEER_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+# Bhul banan-er match kotota kachhe hole mene neoa hobe (difflib ratio)
+GAZETTEER_FUZZY_CUTOFF = float(os.getenv("GAZETTEER_FUZZY_CUTOFF", "0.85"))
+# Er cheye chhoto naam-e fuzzy match hoy na ("Pune" ar "Pone" alada jayga)
+GAZETTEER_FUZZY_MIN_LENGTH = 5
+
+City = namedtuple("City", "id name country lat lon population")
+
+
+def _line_start(mm, position, low):
+    newline = mm.rfind(b"\n", low, position)
+    return low if newline < 0 else newline + 1
+
+
+def _lower_bound(mm, target, key):
+    """Offset of the first line whose key(line) >= target; the file must be sorted by key."""
+    low, high = 0, len(mm)
+    while low < high:
+        start = _line_start(mm, (low + high) // 2, low)
+        end = mm.find(b"\n", start)
+        if key(mm[start:end]) < target:
+            low = end + 1
+        else:
+            high = start
+    return low
+
+
+def _lines(mm, start, stop):
+    while start < stop:
+        end = mm.find(b"\n", start)
+        yield mm[start:end]
+        start = end + 1
+
+
+def _name_key(line):
+    return line.split(b"\t", 1)[0]
+
+
+def _id_key(line):
+    return int(line.split(b"\t", 1)[0])
+
+
+class Gazetteer:
+    """Read-only city index over the memory-mapped files in `directory`."""
+
+    def __init__(self, directory=GAZETTEER_DIR):
+        self._files = []
+        self._cities = self._map(os.path.join(directory, "cities.tsv"))
+        self._names = self._map(os.path.join(directory, "city_names.tsv"))
+        # Country list chhoto (~800 line), shorashori dict
+        with open(os.path.join(directory, "countries.tsv"), encoding="utf-8") as f:
+            self._countries = dict(line.rstrip("\n").split("\t") for line in f)
+
+    def _map(self, path):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append(mm)
+        return mm
+
+    def city(self, city_id):
+        """The city with this GeoNames id, or None."""
+        city_id = int(city_id)
+        offset = _lower_bound(self._cities, city_id, _id_key)
+        if offset >= len(self._cities):
+            return None
+        line = self._cities[offset:self._cities.find(b"\n", offset)]
+        fields = line.decode("utf-8").split("\t")
+        if int(fields[0]) != city_id:
+            return None
+        return City(city_id, fields[1], fields[2], float(fields[3]), float(fields[4]), int(fields[5]))
+
+    def ids(self, name) -> list:
+        """GeoNames ids for an exact (normalized) name or alias, most populous first."""
+        target = normalize_key(name).encode("utf-8")
+        if not target:
+            return []
+        offset = _lower_bound(self._names, target, _name_key)
+        if offset >= len(self._names):
+            return []
+        key, _, ids = self._names[offset:self._names.find(b"\n", offset)].partition(b"\t")
+        return [int(city_id) for city_id in ids.split(b",")] if key == target else []
+
+    def country(self, text):
+        """ISO2 code for a country name or ISO2/ISO3 code, or None."""
+        return self._countries.get(normalize_key(text))
+
+    def _fuzzy_ids(self, name) -> list:
+        # Bhul banan-e prothom duto akkhor shadharonoto thik thake; tai shudhu oi
+        # prefix-er range-e length-er kachhakachhi naam-gulo difflib diye tulona
+        target = normalize_key(name)
+        if len(target) < GAZETTEER_FUZZY_MIN_LENGTH:
+            return []
+        prefix = target[:2].encode("utf-8")
+        start = _lower_bound(self._names, prefix, _name_key)
+        stop = _lower_bound(self._names, prefix + b"\xff", _name_key)
+
+        matcher = difflib.SequenceMatcher(b=target, autojunk=False)
+        best, best_keys, best_ids = GAZETTEER_FUZZY_CUTOFF, 0, []
+        for line in _lines(self._names, start, stop):
+            key, _, ids = line.partition(b"\t")
+            key = key.decode("utf-8")
+            if abs(len(key) - len(target)) > 2:
+                continue
+            matcher.set_seq1(key)
+            if matcher.real_quick_ratio() < best or matcher.quick_ratio() < best:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best:
+                best, best_keys, best_ids = ratio, 0, []
+            if ratio >= best:
+                best_keys += 1
+                best_ids = [int(city_id) for city_id in ids.split(b",")]
+        # Duto alada naam soman kachhe hole ("narnia": narita, narnal) kon-ta bojhay jana nei
+        return best_ids if best_keys == 1 else []
+
+    def resolve(self, text):
+        """
+        The city a free-form place string refers to: a name or alias, optionally followed
+        by ", <country>" ("Hyderabad, PK"), with a fuzzy match for misspellings.
+        Ambiguous names resolve to the most populous city. None if nothing matches.
+        """
+        parts = [part for part in (text or "").split(",") if part.strip()]
+        if not parts:
+            return None
+        country = self.country(parts[-1]) if len(parts) > 1 else None
+        name = parts[0]
+
+        ids = self.ids(",".join(parts)) or self.ids(name) or self._fuzzy_ids(name)
+        cities = [self.city(city_id) for city_id in ids]
+        if country:
+            cities = [city for city in cities if city.country == country] or cities
+        return cities[0] if cities else None
+
+    def close(self):
+        for mm in self._files:
+            mm.close()
+
+
+_gazetteer = None
+_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """The process-wide index, opened (memory-mapped) on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve_city(text: str):
+    """get_gazetteer().resolve() with the answers for recent strings cached."""
+    return get_gazetteer().resolve(text)
+
+
+def city_by_id(city_id):
+    return get_gazetteer().city(city_id)
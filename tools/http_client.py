@@ -0,0 +1,103 @@
+# tools/http_client.py
+# Shob tool ek-i pooled requests.Session use kore, jate protiti call-e notun
+# TCP + TLS handshake na lage, ar kono slow upstream worker-ke chirodin atke na rakhe.
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+# Koto gulo alada host-er pool rakha hobe, ar protiti host-e max koto connection
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "20"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_HOSTS,
+                    pool_maxsize=HTTP_POOL_PER_HOST,
+                    pool_block=True,  # per-host limit-er beshi connection khulbe na, wait korbe
+                    max_retries=0,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def close_session():
+    """Closes every pooled connection (shutdown, or tests that swap servers)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def retry_after_seconds(response):
+    """The response's Retry-After header in seconds (numeric form only), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, retry_after=None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, HTTP_BACKOFF_MAX))
+    return delay
+
+
+def get(url: str, params=None, timeout=None, retries=None, **kwargs) -> requests.Response:
+    """
+    GET through the shared session with connect/read timeouts.
+    Retries connection errors, timeouts and 429/5xx responses with jittered exponential
+    backoff. The last response is returned as-is, so callers still use raise_for_status().
+    """
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    if retries is None:
+        retries = HTTP_MAX_RETRIES
+
+    session = get_session()
+    attempt = 0
+    while True:
+        try:
+            response = session.get(url, params=params, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt >= retries:
+            return response
+
+        delay = backoff_delay(attempt, retry_after_seconds(response))
+        response.close()
+        time.sleep(delay)
+        attempt += 1
@@ -1,4 +1,105 @@
-import sympy
+import ast
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from functools import lru_cache
+
+# Shudhu ei character-gulo rakha hoy, baki shob filter hoye jay
+ALLOWED_CHARS = "0123456789.+-*/() "
+
+# Onek boro power (9**9**9) ba result hole fast path chere SymPy-r hate dewa hoy
+MAX_EXPONENT = 1000
+MAX_RESULT_BITS = 4096
+# SymPy-r evalf() default-er moto 15 significant digit
+DECIMAL_DIGITS = 15
+
+
+class _Unsupported(Exception):
+    """The fast evaluator can't handle this expression; fall back to SymPy."""
+
+
+_BINARY_OPS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Pow: "**"}
+
+
+def _compile_node(node, source):
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        # float value use na kore literal text theke exact Fraction banano hoy ("0.1" thik 1/10)
+        literal = ast.get_source_segment(source, node)
+        return ("num", Fraction(literal))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        operand = _compile_node(node.operand, source)
+        return ("neg", operand) if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        return ("bin", _BINARY_OPS[type(node.op)], _compile_node(node.left, source), _compile_node(node.right, source))
+    raise _Unsupported(ast.dump(node))
+
+
+@lru_cache(maxsize=1024)
+def _compile(expression: str):
+    """Parses and validates an expression once; repeated expressions reuse the compiled tree."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise _Unsupported(str(e))
+    return _compile_node(tree.body, expression.strip())
+
+
+def _evaluate(program) -> Fraction:
+    kind = program[0]
+    if kind == "num":
+        return program[1]
+    if kind == "neg":
+        return -_evaluate(program[1])
+
+    op, left, right = program[1], _evaluate(program[2]), _evaluate(program[3])
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if op == "/":
+        return left / right
+    # "**": shudhu integer exponent exact-bhabe kora jay
+    if right.denominator != 1 or abs(right.numerator) > MAX_EXPONENT:
+        raise _Unsupported("non-integer or very large exponent")
+    if left == 0 and right < 0:
+        raise ZeroDivisionError("zero to a negative power")
+    bits = max(abs(left.numerator).bit_length(), left.denominator.bit_length())
+    if bits * abs(right.numerator) > MAX_RESULT_BITS:
+        raise _Unsupported("result too large")
+    return left ** int(right)
+
+
+def _format(value: Fraction) -> str:
+    if value.denominator == 1:
+        return str(value.numerator)
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_DIGITS
+        result = (Decimal(value.numerator) / Decimal(value.denominator)).normalize()
+    # Choto/majhari number plain decimal-e, khub choto/boro hole scientific notation
+    if -7 <= result.adjusted() < DECIMAL_DIGITS:
+        return format(result, "f")
+    return str(result)
+
+
+def _sympy_evaluate(expression: str) -> str:
+    # SymPy import kora onek slow, tai shudhu dorkar holei (lazy) import hoy
+    import sympy
+    result = sympy.sympify(expression)
+    # .evalf() function'ta result'take decimal number'e convert kore dey
+    return str(result.evalf())
+
+
+def evaluate_expression(expression: str) -> str:
+    """Evaluates an arithmetic expression exactly, falling back to SymPy when needed."""
+    try:
+        value = _evaluate(_compile(expression))
+    except _Unsupported:
+        return _sympy_evaluate(expression)
+    if abs(value.numerator).bit_length() > MAX_RESULT_BITS:
+        return _sympy_evaluate(expression)
+    return _format(value)
+
 
 def solve_math(expression: str) -> str:
     """
@@ -9,19 +110,17 @@ def solve_math(expression: str) -> str:
         # User-er deoa text theke shudhu math expression'ta ber kore ana hocche
         # Jemon "solve this 2+2" theke shudhu "2+2" neoya hobe
         # Eta ekta simple approach, kintu onek kaaj korbe
-        allowed_chars = "0123456789.+-*/() "
-        clean_expression = "".join(filter(lambda char: char in allowed_chars, expression))
+        clean_expression = "".join(filter(lambda char: char in ALLOWED_CHARS, expression))
 
-        if not clean_expression:
+        if not clean_expression.strip():
             return "Sorry, I couldn't find a valid math expression in your message."
 
-        result = sympy.sympify(clean_expression)
-        
-        # .evalf() function'ta result'take decimal number'e convert kore dey
-        final_answer = result.evalf() 
-        
+        final_answer = evaluate_expression(clean_expression)
+
         return f"The answer to '{clean_expression.strip()}' is: {final_answer}"
-        
+
+    except ZeroDivisionError:
+        return "Sorry, division by zero is undefined. Please check your expression."
     except Exception as e:
         print(f"Math tool error: {e}")
         return "Sorry, I couldn't solve that math problem. Please provide a valid expression like '5 * 10' or '100 / 4'."
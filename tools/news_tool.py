@@ -1,10 +1,33 @@
 # tools/news_tool.py
 import os
-import requests
-from dotenv import load_dotenv
+from tools import quota
+from tools.cache import TTLCache, normalize_key
 
-load_dotenv()
 API_KEY = os.getenv("NEWS_API_KEY")
+NEWS_URL = "https://gnews.io/api/v4/top-headlines"
+
+# GNews-er daily quota khub kom (100), tai headline kichukkhon cache-e rakhi; quota prai
+# shesh hole STALE window-er moddhe purono headline-o dewa hoy
+NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", "300"))
+NEWS_CACHE_STALE = int(os.getenv("NEWS_CACHE_STALE", str(6 * 60 * 60)))
+
+_news_cache = TTLCache(ttl=NEWS_CACHE_TTL, maxsize=256, stale_ttl=NEWS_CACHE_STALE)
+
+def _fetch_headlines(params: dict) -> list:
+    response = quota.scheduler.request("gnews", NEWS_URL, params={**params, "apikey": API_KEY})
+    response.raise_for_status()
+    data = response.json()
+
+    headlines = []
+    if data.get("totalArticles") > 0 and data.get("articles"):
+        for article in data["articles"]:
+            # GNews has a different structure for the source name
+            source_name = article['source']['name']
+            headlines.append(f"- {article['title']} ({source_name})")
+    return headlines
+
+def _format_headlines(headlines: list) -> str:
+    return "Here are the top headlines from India:\n" + "\n".join(headlines)
 
 def get_latest_news(topic: str) -> str:
     """
@@ -13,31 +36,30 @@ def get_latest_news(topic: str) -> str:
     if not API_KEY:
         return "Error: News API key is not configured."
 
-    # This is the new URL for the GNews API
-    url = f"https://gnews.io/api/v4/top-headlines?country=in&lang=en&max=5&apikey={API_KEY}"
+    params = {"country": "in", "lang": "en", "max": 5}
 
     # For GNews, we can add the topic as a keyword if it's not generic
     generic_terms = ["news", "latest news", "latest", "headlines", "top news", "india", "bharat"]
     if topic.lower().strip() not in generic_terms:
-        url += f"&q={topic}"
-
-    print(f"DEBUG: Calling GNews API with URL: {url}")
+        params["q"] = topic
 
+    key = normalize_key(params.get("q", ""))
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("totalArticles") > 0 and data.get("articles"):
-            headlines = []
-            for article in data["articles"]:
-                # GNews has a different structure for the source name
-                source_name = article['source']['name']
-                headlines.append(f"- {article['title']} ({source_name})")
-            
-            return "Here are the top headlines from India:\n" + "\n".join(headlines)
+        headlines = _news_cache.get(key, allow_stale=quota.scheduler.should_degrade("gnews"))
+        if headlines is None:
+            headlines = _fetch_headlines(params)
+            if headlines:
+                _news_cache.set(key, headlines)
+
+        if headlines:
+            return _format_headlines(headlines)
         else:
             return f"Sorry, I couldn't find any recent news on '{topic}' from India."
-            
+
+    except quota.QuotaExceeded as e:
+        headlines = _news_cache.get(key, allow_stale=True)
+        if headlines:
+            return _format_headlines(headlines)
+        return f"Sorry, the news service has reached its request limit. Please try again in about {max(1, round(e.retry_after / 60))} minute(s)."
     except Exception as e:
         return f"Sorry, an error occurred while fetching the news: {e}"
\ No newline at end of file
@@ -0,0 +1,284 @@
+# tools/quota.py
+# GNews, SerpAPI ar OpenWeather-er per-minute ar per-day quota ache. Shob upstream
+# call ekhane diye jay: protiti provider-er ekta token bucket (per-minute), SQLite-e
+# persistent daily counter (restart/onek process-e-o thik thake), interactive call-ke
+# research-er age jayga deoa priority queue, 429/503-er Retry-After mene backoff, ar
+# http_client-er moto 5xx/connection error retry (protiti attempt quota-y gona hoy).
+# Quota prai shesh hole tool-gulo error na diye cached result dey (should_degrade).
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+from tools import http_client
+
+QUOTA_DB = os.getenv("QUOTA_DB", "api_quota.db")
+# Daily quota-r ei ongsho bebohar hoye gele tool-gulo cached result-e chole jay
+QUOTA_LOW_WATERMARK = float(os.getenv("QUOTA_LOW_WATERMARK", "0.9"))
+# Interactive call token-er jonno max koto second wait korbe (research beshi)
+QUOTA_INTERACTIVE_WAIT = float(os.getenv("QUOTA_INTERACTIVE_WAIT", "5"))
+QUOTA_RESEARCH_WAIT = float(os.getenv("QUOTA_RESEARCH_WAIT", "30"))
+QUOTA_MAX_RETRIES = int(os.getenv("QUOTA_MAX_RETRIES", str(http_client.HTTP_MAX_RETRIES)))
+# Queue-te samne na thaka caller koto por por abar dekhe
+QUOTA_POLL_INTERVAL = 0.05
+
+# Queue priority: user-er chat turn-er chhoto call (weather, news) bonam deep_research-er
+# moto lomba kaaj, ja interactive call-er pichone wait kore. Low watermark-er porer reserve
+# alada proshno (acquire-er reserve flag); default-e shudhu INTERACTIVE seta pay.
+INTERACTIVE = 0
+RESEARCH = 1
+
+# provider -> (per minute, per day); env QUOTA_<PROVIDER>_PER_MINUTE / _PER_DAY diye bodlano jay
+DEFAULT_LIMITS = {
+    "openweather": (60, 30000),
+    "gnews": (30, 100),
+    "serpapi": (10, 100),
+}
+
+
+class QuotaExceeded(Exception):
+    """Raised when a call can't get a quota slot in time; retry_after is in seconds."""
+
+    def __init__(self, provider, retry_after, reason):
+        super().__init__(f"{provider} quota {reason}, retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class SystemClock:
+    monotonic = staticmethod(time.monotonic)
+    sleep = staticmethod(time.sleep)
+    time = staticmethod(time.time)  # shesh-e, naile class body-te "time" module dheke jay
+
+
+class TokenBucket:
+    """
+    Classic token bucket. capacity tokens are available at once and the rest refill at
+    `rate` per second, so at most capacity + 60 * rate calls happen in any minute.
+    """
+
+    def __init__(self, rate, capacity, clock):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._clock = clock
+        self._updated = clock.monotonic()
+
+    def _refill(self):
+        now = self._clock.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if one is available now)."""
+        self._refill()
+        # Float rounding-e 0.9999999 token-er jonno chirodin ghure na bedai
+        if self.tokens >= 1 - 1e-6:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class _Provider:
+    def __init__(self, name, per_minute, per_day, clock):
+        self.name = name
+        self.per_day = per_day
+        # Burst + refill mile kono 60 second window-e per_minute-er beshi hoy na
+        burst = max(1, per_minute // 10)
+        self.bucket = TokenBucket(max(per_minute - burst, 1) / 60, burst, clock)
+        self.waiters = []
+        self.blocked_until = 0.0
+
+
+class QuotaScheduler:
+    """Per-provider rate limiting, daily accounting and backoff for upstream API calls."""
+
+    def __init__(self, limits=None, db_path=None, clock=None):
+        self._clock = clock or SystemClock()
+        self._db_path = db_path or QUOTA_DB
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._sequence = itertools.count()
+        self._providers = {}
+        for name, (per_minute, per_day) in (limits or DEFAULT_LIMITS).items():
+            prefix = f"QUOTA_{name.upper()}"
+            per_minute = int(os.getenv(f"{prefix}_PER_MINUTE", per_minute))
+            per_day = int(os.getenv(f"{prefix}_PER_DAY", per_day))
+            self._providers[name] = _Provider(name, per_minute, per_day, self._clock)
+
+    # --- Daily counters (SQLite) ---
+
+    def _connection(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS api_quota (
+                    provider TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    used INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (provider, day)
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _today(self):
+        # Provider-ra UTC midnight-e quota reset kore
+        return time.strftime("%Y-%m-%d", time.gmtime(self._clock.time()))
+
+    def _seconds_until_reset(self):
+        now = self._clock.time()
+        return 86400 - now % 86400
+
+    def used_today(self, provider) -> int:
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT used FROM api_quota WHERE provider = ? AND day = ?", (provider, self._today())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def _reserve_daily(self, provider):
+        # Ek statement-e check + increment, tai onek process-eo limit-er beshi jay na
+        with self._db_lock:
+            conn = self._connection()
+            with conn:
+                day = self._today()
+                conn.execute("INSERT OR IGNORE INTO api_quota (provider, day) VALUES (?, ?)", (provider.name, day))
+                cursor = conn.execute(
+                    "UPDATE api_quota SET used = used + 1 WHERE provider = ? AND day = ? AND used < ?",
+                    (provider.name, day, provider.per_day))
+        return cursor.rowcount == 1
+
+    def _refund_daily(self, provider):
+        # 429 response provider-er quota-y gona hoy na
+        with self._db_lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "UPDATE api_quota SET used = used - 1 WHERE provider = ? AND day = ? AND used > 0",
+                    (provider.name, self._today()))
+
+    # --- Scheduling ---
+
+    def should_degrade(self, provider) -> bool:
+        """
+        True when callers should serve cached (even stale) results if they have any:
+        the provider is backing off after a 429, or today's quota is past the low watermark.
+        """
+        state = self._providers[provider]
+        if self._clock.monotonic() < state.blocked_until:
+            return True
+        return self.used_today(provider) >= state.per_day * QUOTA_LOW_WATERMARK
+
+    def block(self, provider, seconds):
+        """Stops calls to a provider for `seconds` (Retry-After, or a backoff delay)."""
+        state = self._providers[provider]
+        with self._lock:
+            state.blocked_until = max(state.blocked_until, self._clock.monotonic() + seconds)
+
+    def acquire(self, provider, priority=INTERACTIVE, max_wait=None, reserve=None):
+        """
+        Waits for a rate-limit token (higher-priority callers first) and reserves one call
+        from today's quota. reserve says whether the call may use the quota past the low
+        watermark (default: only INTERACTIVE calls may).
+        Raises QuotaExceeded if that can't happen within max_wait.
+        """
+        state = self._providers[provider]
+        if max_wait is None:
+            max_wait = QUOTA_INTERACTIVE_WAIT if priority == INTERACTIVE else QUOTA_RESEARCH_WAIT
+        if reserve is None:
+            reserve = priority == INTERACTIVE
+        # Low watermark-er porer quota shudhu user-er jonno call-er (cache miss hole)
+        if not reserve and self.used_today(provider) >= state.per_day * QUOTA_LOW_WATERMARK:
+            raise QuotaExceeded(provider, self._seconds_until_reset(), "reserved for interactive calls")
+
+        deadline = self._clock.monotonic() + max_wait
+        ticket = (priority, next(self._sequence))
+        with self._lock:
+            heapq.heappush(state.waiters, ticket)
+        try:
+            while True:
+                with self._lock:
+                    now = self._clock.monotonic()
+                    wait = max(0.0, state.blocked_until - now)
+                    first = state.waiters[0] == ticket
+                    if wait == 0 and first:
+                        wait = state.bucket.wait_time()
+                        if wait == 0:
+                            state.bucket.take()
+                            heapq.heappop(state.waiters)
+                            break
+                if now + wait > deadline:
+                    raise QuotaExceeded(provider, wait, "rate limited")
+                # Samne onno caller thakle tara kokhon token pabe jani na, tai ektu por por dekhi
+                self._clock.sleep(wait if first else min(wait, QUOTA_POLL_INTERVAL) or QUOTA_POLL_INTERVAL)
+        finally:
+            with self._lock:
+                if ticket in state.waiters:
+                    state.waiters.remove(ticket)
+                    heapq.heapify(state.waiters)
+
+        if not self._reserve_daily(state):
+            raise QuotaExceeded(provider, self._seconds_until_reset(), "exhausted for today")
+
+    def request(self, provider, url, params=None, priority=INTERACTIVE, max_wait=None, reserve=None,
+                **kwargs):
+        """
+        http_client.get() under the provider's quota. Retries what http_client.get() retries
+        (connection errors, timeouts, 429/5xx) with jittered backoff; every attempt takes its
+        own token and daily slot. A 429/503 blocks the whole provider for its Retry-After.
+        """
+        state = self._providers[provider]
+        for attempt in range(QUOTA_MAX_RETRIES + 1):
+            self.acquire(provider, priority, max_wait, reserve)
+            last = attempt == QUOTA_MAX_RETRIES
+            try:
+                response = http_client.get(url, params=params, retries=0, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+                self._clock.sleep(http_client.backoff_delay(attempt))
+                continue
+            if response.status_code not in http_client.RETRY_STATUSES or last:
+                return response
+            retry_after = http_client.retry_after_seconds(response)
+            if response.status_code in (429, 503):
+                # Provider nije rate limit korche: shob caller-i backoff-e jay
+                self.block(provider, retry_after if retry_after is not None else http_client.backoff_delay(attempt))
+            else:
+                self._clock.sleep(http_client.backoff_delay(attempt, retry_after))
+            if response.status_code == 429:
+                self._refund_daily(state)
+            response.close()
+
+    def stats(self) -> dict:
+        """provider -> used today, daily limit, tokens left in the bucket, backoff remaining."""
+        stats = {}
+        for name, state in self._providers.items():
+            with self._lock:
+                state.bucket.wait_time()  # refill
+                tokens = state.bucket.tokens
+                blocked = max(0.0, state.blocked_until - self._clock.monotonic())
+            stats[name] = {
+                "used_today": self.used_today(name),
+                "per_day": state.per_day,
+                "tokens": round(tokens, 2),
+                "blocked_for": round(blocked, 1),
+            }
+        return stats
+
+
+# Process-wide scheduler: shob tool ek-i bucket ar counter share kore
+scheduler = QuotaScheduler()
@@ -0,0 +1,72 @@
+# tools/registry.py
+# Gemini-ke tool-er naam, signature ar docstring dite hoy, kintu tool module-gulo
+# (requests, SymPy, ...) import korte onek shomoy lage. Tai ekhane halka stub function
+# declare kora ache; asol module prothom call-er shomoy import hoy.
+import functools
+import importlib
+import inspect
+
+from tools.cache import normalize_key
+from tools.singleflight import tool_calls
+
+
+def _call_key(name, signature, args, kwargs):
+    # "Mumbai" ar " mumbai" ek-i call; argument position/keyword jekono bhabe dile-o
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (name,) + tuple(
+        normalize_key(value) if isinstance(value, str) else repr(value)
+        for value in bound.arguments.values()
+    )
+
+
+def lazy_tool(module_name: str):
+    """
+    Declares a tool by its stub signature and docstring; the implementation with the same
+    name is imported from module_name on first call. functools.wraps keeps __name__,
+    __doc__ and the signature (via __wrapped__) for Gemini's function declarations.
+    Identical concurrent calls share one execution (see tools.singleflight).
+    """
+    def decorator(stub):
+        signature = inspect.signature(stub)
+
+        @functools.wraps(stub)
+        def wrapper(*args, **kwargs):
+            implementation = getattr(importlib.import_module(module_name), stub.__name__)
+            key = _call_key(stub.__name__, signature, args, kwargs)
+            return tool_calls.do(key, lambda: implementation(*args, **kwargs), name=stub.__name__)
+        return wrapper
+    return decorator
+
+
+@lazy_tool("tools.weather_tool")
+def get_weather(city: str) -> str:
+    """Gets the current weather for a given city from an API. Add the country if the name is ambiguous, like 'Hyderabad, PK'."""
+
+
+@lazy_tool("tools.math_tool")
+def solve_math(expression: str) -> str:
+    """
+    Calculates the result of a mathematical expression and returns a precise decimal answer.
+    Use this tool for ANY math calculation, like addition, subtraction, multiplication, division, etc.
+    """
+
+
+@lazy_tool("tools.news_tool")
+def get_latest_news(topic: str) -> str:
+    """
+    Fetches the top 5 latest news headlines from India using the GNews API.
+    """
+
+
+@lazy_tool("tools.research_tool")
+def deep_research(topic: str) -> str:
+    """
+    Searches Google for a given topic, reads the top result pages and returns the
+    passages most relevant to the topic, with their source titles and URLs.
+    Use this tool to find information about any real-world topic, event, or place.
+    """
+
+
+# Model-ke ei list-tai deoa hoy
+TOOLS = [get_weather, solve_math, get_latest_news, deep_research]
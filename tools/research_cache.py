@@ -0,0 +1,143 @@
+# tools/research_cache.py
+# deep_research-er result-gulo disk-e (alada SQLite file-e) cache kora hoy,
+# jate ek-i topic-er jonno bar bar paid SerpAPI call na lage ar redeploy-er por-o cache thake.
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from tools.cache import normalize_key
+
+RESEARCH_CACHE_DB = os.getenv("RESEARCH_CACHE_DB", "research_cache.db")
+RESEARCH_CACHE_TTL = int(os.getenv("RESEARCH_CACHE_TTL", str(24 * 60 * 60)))
+# Compressed data-r mot byte budget; beshi hole least-recently-used entry age bad jabe
+RESEARCH_CACHE_MAX_BYTES = int(os.getenv("RESEARCH_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _get_connection():
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(RESEARCH_CACHE_DB, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS research_cache (
+                query_key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_research_cache_last_access ON research_cache (last_access)"
+        )
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def get(query: str, allow_expired: bool = False):
+    """Returns the cached result text for a query, or None on a miss or expired entry."""
+    key = normalize_key(query)
+    now = time.time()
+    with _lock:
+        conn = _get_connection()
+        row = conn.execute(
+            "SELECT data, expires_at FROM research_cache WHERE query_key = ?", (key,)
+        ).fetchone()
+        if row is None or (row['expires_at'] <= now and not allow_expired):
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE research_cache SET last_access = ?, hits = hits + 1 WHERE query_key = ?",
+                (now, key))
+    return zlib.decompress(row['data']).decode('utf-8')
+
+
+def put(query: str, text: str, ttl: int = None):
+    """Stores a result (zlib-compressed) and evicts LRU entries beyond the byte budget."""
+    key = normalize_key(query)
+    data = zlib.compress(text.encode('utf-8'), 6)
+    now = time.time()
+    ttl = RESEARCH_CACHE_TTL if ttl is None else ttl
+    with _lock:
+        conn = _get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO research_cache "
+                "(query_key, query, data, size, created_at, expires_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, query, data, len(data), now, now + ttl, now))
+            _evict(conn)
+
+
+def _evict(conn):
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM research_cache").fetchone()[0]
+    if total <= RESEARCH_CACHE_MAX_BYTES:
+        return
+    # Age expired entry-gulo, tarpor shobcheye purono last_access theke delete
+    conn.execute("DELETE FROM research_cache WHERE expires_at <= ?", (time.time(),))
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM research_cache").fetchone()[0]
+    rows = conn.execute("SELECT query_key, size FROM research_cache ORDER BY last_access").fetchall()
+    victims = []
+    for row in rows:
+        if total <= RESEARCH_CACHE_MAX_BYTES:
+            break
+        victims.append((row['query_key'],))
+        total -= row['size']
+    conn.executemany("DELETE FROM research_cache WHERE query_key = ?", victims)
+
+
+# --- Admin API ---
+
+def cache_info() -> dict:
+    """Entry count, compressed bytes used, budget and expired-entry count."""
+    with _lock:
+        row = _get_connection().execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes, "
+            "COALESCE(SUM(expires_at <= ?), 0) AS expired, COALESCE(SUM(hits), 0) AS hits "
+            "FROM research_cache", (time.time(),)
+        ).fetchone()
+    return {
+        "entries": row['entries'],
+        "bytes": row['bytes'],
+        "max_bytes": RESEARCH_CACHE_MAX_BYTES,
+        "expired": row['expired'],
+        "hits": row['hits'],
+        "path": RESEARCH_CACHE_DB,
+    }
+
+
+def list_entries(limit: int = 50) -> list:
+    """Most recently used entries, without their payload."""
+    with _lock:
+        rows = _get_connection().execute(
+            "SELECT query, size, created_at, expires_at, last_access, hits "
+            "FROM research_cache ORDER BY last_access DESC LIMIT ?", (limit,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def purge(query: str = None, expired_only: bool = False) -> int:
+    """Deletes one query, only expired entries, or everything. Returns the number removed."""
+    with _lock:
+        conn = _get_connection()
+        with conn:
+            if query is not None:
+                cursor = conn.execute(
+                    "DELETE FROM research_cache WHERE query_key = ?", (normalize_key(query),))
+            elif expired_only:
+                cursor = conn.execute(
+                    "DELETE FROM research_cache WHERE expires_at <= ?", (time.time(),))
+            else:
+                cursor = conn.execute("DELETE FROM research_cache")
+        return cursor.rowcount
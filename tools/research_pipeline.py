@@ -0,0 +1,212 @@
+# tools/research_pipeline.py
+# SerpAPI-r 5 ta one-line snippet diye research summary patla hoy. Tai top result
+# page-gulo ek-i shathe (bounded pool, per-page deadline) fetch kore, HTML stream
+# korte korte text-e strip kori, chhoto passage-e bhag kori, BM25 diye query-r
+# shathe rank kori, ar shudhu token budget-er moddhe best passage-gulo model-ke dei.
+import codecs
+import math
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+
+from tools import http_client
+
+# Koto gulo result URL fetch hobe, ar ek shathe max koto ta
+RESEARCH_FETCH_PAGES = int(os.getenv("RESEARCH_FETCH_PAGES", "5"))
+RESEARCH_FETCH_WORKERS = int(os.getenv("RESEARCH_FETCH_WORKERS", "5"))
+# Ekta page-er jonno mot somoy (connect + download); slow site puro research atkabe na
+RESEARCH_PAGE_TIMEOUT = float(os.getenv("RESEARCH_PAGE_TIMEOUT", "4"))
+# Boro page-er prothom ei koto byte-i pora hoy
+RESEARCH_MAX_PAGE_BYTES = int(os.getenv("RESEARCH_MAX_PAGE_BYTES", str(1024 * 1024)))
+# Passage size (words) ar pashapashi passage-er overlap
+RESEARCH_PASSAGE_WORDS = int(os.getenv("RESEARCH_PASSAGE_WORDS", "120"))
+RESEARCH_PASSAGE_OVERLAP = 20
+# Model-ke max koto passage ar koto token deoa hobe
+RESEARCH_TOP_PASSAGES = int(os.getenv("RESEARCH_TOP_PASSAGES", "6"))
+RESEARCH_TOKEN_BUDGET = int(os.getenv("RESEARCH_TOKEN_BUDGET", "1500"))
+
+_fetch_executor = ThreadPoolExecutor(max_workers=RESEARCH_FETCH_WORKERS, thread_name_prefix="research-fetch")
+
+# Ei tag-er bhitorer text kono kaje lage na (code, menu, footer)
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "footer", "header", "aside", "form"}
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "section", "article", "main", "tr", "table",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre",
+}
+STOPWORDS = set(
+    "a an and are as at be by for from has have in is it its of on or that the this to was "
+    "were what when where which who will with about how why does do".split()
+)
+
+
+class _TextExtractor(HTMLParser):
+    """Incremental HTML to plain text; feed() it chunks as they are downloaded."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.title = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self.parts).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+def fetch_page_text(url: str, timeout=RESEARCH_PAGE_TIMEOUT, max_bytes=RESEARCH_MAX_PAGE_BYTES) -> str:
+    """
+    Downloads a page and returns its visible text. The body is streamed and parsed as
+    it arrives; reading stops at max_bytes or once `timeout` seconds have passed.
+    Non-HTML/text responses give an empty string.
+    """
+    deadline = time.monotonic() + timeout
+    response = http_client.get(
+        url, timeout=(min(http_client.HTTP_CONNECT_TIMEOUT, timeout), timeout), retries=0, stream=True,
+        headers={"User-Agent": "Mozilla/5.0 (compatible; YES-Ai-research)"},
+    )
+    try:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "text/html")
+        if "html" not in content_type and not content_type.startswith("text/"):
+            return ""
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        parser = _TextExtractor()
+        received = 0
+        for chunk in response.iter_content(chunk_size=16 * 1024):
+            parser.feed(decoder.decode(chunk))
+            received += len(chunk)
+            if received >= max_bytes or time.monotonic() > deadline:
+                break
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        return parser.text()
+    finally:
+        response.close()
+
+
+def chunk_passages(text: str, words=RESEARCH_PASSAGE_WORDS, overlap=RESEARCH_PASSAGE_OVERLAP) -> list:
+    """Splits text into passages of about `words` words that overlap a little."""
+    tokens = text.split()
+    if not tokens:
+        return []
+    step = max(1, words - overlap)
+    return [" ".join(tokens[start:start + words]) for start in range(0, max(1, len(tokens) - overlap), step)]
+
+
+def _terms(text: str) -> list:
+    return [term for term in re.findall(r"\w+", text.casefold()) if term not in STOPWORDS]
+
+
+def bm25_rank(query: str, passages: list, k1=1.5, b=0.75) -> list:
+    """Returns (score, index) pairs for the passages, best first; passages without a query term are dropped."""
+    query_terms = set(_terms(query))
+    if not query_terms or not passages:
+        return []
+    documents = [Counter(_terms(passage)) for passage in passages]
+    average_length = sum(sum(doc.values()) for doc in documents) / len(documents) or 1
+    document_frequency = Counter(term for doc in documents for term in query_terms if term in doc)
+
+    scored = []
+    for index, doc in enumerate(documents):
+        length = sum(doc.values())
+        score = 0.0
+        for term in query_terms:
+            frequency = doc.get(term)
+            if not frequency:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * length / average_length))
+        if score > 0:
+            scored.append((score, index))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return scored
+
+
+def _estimate_tokens(text: str) -> int:
+    # chat_context.estimate_tokens-er moto (~4 character per token)
+    return len(text) // 4 + 1
+
+
+def fetch_pages(urls, timeout=RESEARCH_PAGE_TIMEOUT) -> dict:
+    """Fetches the URLs concurrently on the bounded pool; returns url -> text for the ones that worked."""
+    futures = {_fetch_executor.submit(fetch_page_text, url, timeout): url for url in urls}
+    # Pool bhora thakle page queue-te wait kore, tai mot somoy-er ekta upper bound
+    rounds = math.ceil(len(futures) / RESEARCH_FETCH_WORKERS) if futures else 0
+    done, not_done = wait(futures, timeout=timeout * rounds + 1)
+    for future in not_done:
+        future.cancel()
+
+    pages = {}
+    for future in done:
+        url = futures[future]
+        try:
+            text = future.result()
+        except Exception as e:
+            print(f"Research fetch failed for {url}: {e}")
+            continue
+        if text:
+            pages[url] = text
+    return pages
+
+
+def research_passages(query: str, results: list, top_k=RESEARCH_TOP_PASSAGES,
+                      token_budget=RESEARCH_TOKEN_BUDGET, max_pages=RESEARCH_FETCH_PAGES) -> list:
+    """
+    Fetches the top search results' pages and returns the passages most relevant to query
+    as dicts (title, url, text, score), best first, within token_budget. The SerpAPI
+    snippets take part in the ranking too, so something comes back even if every fetch fails.
+    """
+    links = [result["link"] for result in results if result.get("link")][:max_pages]
+    titles = {result.get("link"): result.get("title") or "" for result in results}
+    pages = fetch_pages(links)
+
+    candidates = []
+    for result in results:
+        if result.get("snippet"):
+            candidates.append((result.get("title") or "", result.get("link") or "", result["snippet"]))
+    for url in links:
+        for passage in chunk_passages(pages.get(url, "")):
+            candidates.append((titles.get(url, ""), url, passage))
+
+    selected, used, seen = [], 0, set()
+    for score, index in bm25_rank(query, [text for _, _, text in candidates]):
+        title, url, text = candidates[index]
+        # Mirror site ba syndicated article-e hubohu ek-i passage bar bar ashe
+        if text in seen:
+            continue
+        seen.add(text)
+        cost = _estimate_tokens(text) + _estimate_tokens(title + url)
+        if used + cost > token_budget:
+            continue
+        selected.append({"title": title, "url": url, "text": text, "score": round(score, 3)})
+        used += cost
+        if len(selected) >= top_k:
+            break
+    return selected
@@ -1,35 +1,63 @@
 import os
-from serpapi import GoogleSearch
-from dotenv import load_dotenv
+from tools import quota
+from tools import research_cache
+from tools import research_pipeline
 
-load_dotenv()
 API_KEY = os.getenv("SERPAPI_KEY")
 
+# SerpAPI-r JSON endpoint shared HTTP client diye direct call kora hoy (keep-alive + retry)
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+def _search(topic: str) -> list:
+    params = { "engine": "google", "q": topic, "api_key": API_KEY, "num": 5 }
+    # Queue-te research priority (chhoto interactive call age jay, beshi wait kora jay), kintu
+    # deep_research shob shomoy user-er prompt theke ashe, tai low watermark-er porer reserve-o pay
+    response = quota.scheduler.request("serpapi", SERPAPI_URL, params=params,
+                                       priority=quota.RESEARCH, reserve=True)
+    response.raise_for_status()
+    return response.json().get("organic_results", [])
+
+def _format_snippets(results: list) -> str:
+    return "\n".join(f"Title: {result.get('title')}\nSummary: {result.get('snippet')}\n---" for result in results)
+
+def _format_passages(passages: list) -> str:
+    sections = [f"[{i}] {p['title']} ({p['url']})\n{p['text']}" for i, p in enumerate(passages, 1)]
+    return "Most relevant passages from the top search results:\n\n" + "\n\n".join(sections)
+
 def deep_research(topic: str) -> str:
     """
-    Searches Google for a given topic and returns the top 5 search result snippets.
+    Searches Google for a given topic, reads the top result pages and returns the
+    passages most relevant to the topic, with their source titles and URLs.
     Use this tool to find information about any real-world topic, event, or place.
     """
     if not API_KEY:
         return "Error: Search API key is not configured."
 
-    params = { "engine": "google", "q": topic, "api_key": API_KEY, "num": 5 }
-
     try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        
-        search_snippets = []
-        if "organic_results" in results:
-            for result in results.get("organic_results", []):
-                snippet = f"Title: {result.get('title')}\nSummary: {result.get('snippet')}\n---"
-                search_snippets.append(snippet)
-        
-        if not search_snippets:
+        # Ager research thakle disk cache theke dei, paid API call lagbe na
+        cached = research_cache.get(topic)
+        if cached is not None:
+            return cached
+        # SerpAPI quota prai shesh: expired research-o na thakar cheye bhalo
+        if quota.scheduler.should_degrade("serpapi"):
+            expired = research_cache.get(topic, allow_expired=True)
+            if expired is not None:
+                return expired
+
+        results = _search(topic)
+        if not results:
             return f"Sorry, I couldn't find any information on '{topic}'."
-        
-        return "\n".join(search_snippets)
 
+        # Page-gulo theke best passage; kichu na pele ager moto shudhu snippet
+        passages = research_pipeline.research_passages(topic, results)
+        result = _format_passages(passages) if passages else _format_snippets(results)
+        research_cache.put(topic, result)
+        return result
+
+    except quota.QuotaExceeded as e:
+        expired = research_cache.get(topic, allow_expired=True)
+        if expired is not None:
+            return expired
+        return f"Sorry, the search quota is used up for now. Please try again in about {max(1, round(e.retry_after / 60))} minute(s)."
     except Exception as e:
         return f"Sorry, an error occurred during the research: {e}"
-
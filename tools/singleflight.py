@@ -0,0 +1,76 @@
+# tools/singleflight.py
+# Boro khobor ba jhor-er shomoy onek session ek-i shathe get_latest_news("cricket")
+# ba get_weather("Mumbai") chay. Ek-i argument-er (normalize korar por) call jodi
+# already cholche, notun caller-ra notun upstream request na kore oi call-er
+# result-er jonno wait kore, ar shobai ek-i result pay.
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the function,
+    callers that arrive while it is running wait and share its result (or exception).
+    Nothing is cached; once the call finishes the next one runs again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {}
+
+    def _count(self, name, field):
+        stats = self._stats.setdefault(name, {"calls": 0, "executions": 0, "deduplicated": 0, "errors": 0})
+        stats[field] += 1
+
+    def do(self, key, function, name="default"):
+        """Runs function() unless an identical call (same key) is in flight; returns its result."""
+        with self._lock:
+            self._count(name, "calls")
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._count(name, "executions")
+            else:
+                self._count(name, "deduplicated")
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._count(name, "errors")
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        """name -> calls, executions (upstream), deduplicated, errors; plus calls in flight."""
+        with self._lock:
+            stats = {name: dict(counts) for name, counts in self._stats.items()}
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# Process-wide instance: shob session-er tool call ekhane coalesce hoy
+tool_calls = SingleFlight()
@@ -1,20 +1,63 @@
 import os
-import requests
-from dotenv import load_dotenv
-load_dotenv()
+from tools import gazetteer, quota
+from tools.cache import TTLCache
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+# Ek-i shohorer weather bar bar fetch na kore process-wide cache theke dei.
+# TTL-er por STALE window-er moddhe purono answer shathe shathe dewa hoy ar background-e refresh hoy.
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))
+WEATHER_CACHE_STALE = int(os.getenv("WEATHER_CACHE_STALE", "1800"))
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "512"))
+
+_weather_cache = TTLCache(
+    ttl=WEATHER_CACHE_TTL, maxsize=WEATHER_CACHE_SIZE, stale_ttl=WEATHER_CACHE_STALE
+)
+
+def _fetch_weather(place):
+    # Naam na, gazetteer-er coordinate diye: "Calcutta" ar "Kolkata, IN" ek-i request
+    response = quota.scheduler.request(
+        "openweather", WEATHER_URL,
+        params={"lat": place.lat, "lon": place.lon, "appid": API_KEY, "units": "metric"})
+    response.raise_for_status()
+    data = response.json()
+    return data['main']['temp'], data['weather'][0]['description']
+
+def _cached_weather(city: str, key: str):
+    cached = _weather_cache.get(key, allow_stale=True)
+    if cached is None:
+        return None
+    temp, weather_desc = cached
+    return f"The current weather in {city} is {temp}°C with {weather_desc} (recent cached reading)."
 
 def get_weather(city: str) -> str:
-    """Gets the current weather for a given city from an API."""
+    """Gets the current weather for a given city from an API. Add the country if the name is ambiguous, like 'Hyderabad, PK'."""
     if not API_KEY:
         return "Error: Weather API key is not configured."
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={API_KEY}&units=metric"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        weather_desc = data['weather'][0]['description']
-        temp = data['main']['temp']
+        # Shohor-er naam offline index-e canonical city-te map hoy; cache key city id.
+        # Index-e na thakle (bhul naam) network-e jaoa-i hoy na.
+        place = gazetteer.resolve_city(city)
+        if place is None:
+            return (f"Sorry, I couldn't find a place called '{city}'. Please check the spelling "
+                    "or add the country, like 'Paris, FR'.")
+        key = place.id
+        city = f"{place.name}, {place.country}"
+        # Quota prai shesh ba provider backoff-e thakle purono reading-o cholbe
+        if quota.scheduler.should_degrade("openweather"):
+            cached = _cached_weather(city, key)
+            if cached is not None:
+                return cached
+        temp, weather_desc = _weather_cache.get_or_load(key, lambda: _fetch_weather(place))
         return f"The current weather in {city} is {temp}°C with {weather_desc}."
+    except quota.QuotaExceeded as e:
+        cached = _cached_weather(city, key)
+        if cached is not None:
+            return cached
+        return f"Sorry, the weather service is busy right now. Please try again in about {max(1, round(e.retry_after / 60))} minute(s)."
     except Exception as e:
-        return f"Sorry, an error occurred while fetching the weather: {e}"
\ No newline at end of file
+        return f"Sorry, an error occurred while fetching the weather: {e}"
+
+def weather_cache_stats() -> dict:
+    """Hit/miss/refresh counters of the weather cache, for sizing the TTL and max size."""
+    return _weather_cache.stats()
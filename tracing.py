@@ -0,0 +1,151 @@
+# tracing.py
+
+# Halka tracing: protiti chat turn, tool call ar database call ekta "span" hishebe
+# record hoy. Memory-te latest sample theke p50/p95/p99 ber kora jay, ar JSONL ba
+# Prometheus text hishebe export kora jay. Kono extra dependency lage na.
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# Protiti span name-er jonno koto gulo latest duration rakha hobe (percentile-er jonno)
+TRACE_SAMPLES = int(os.getenv("TRACE_SAMPLES", "2048"))
+# JSONL export-er jonno koto gulo latest span record rakha hobe
+TRACE_BUFFER = int(os.getenv("TRACE_BUFFER", "5000"))
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_lock = threading.Lock()
+_samples = {}
+_totals = {}
+_recent = deque(maxlen=TRACE_BUFFER)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Times the enclosed block as a span. Nested spans share the parent's trace_id.
+    The yielded dict can be given extra attributes while the span is open.
+    """
+    parent = _current_span.get()
+    record = {
+        "name": name,
+        "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex[:16],
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "start": time.time(),
+        **attributes,
+    }
+    token = _current_span.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = repr(e)
+        raise
+    finally:
+        record["duration_ms"] = (time.perf_counter() - started) * 1000
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Generator onno context-e shesh hole reset kora jay na; parent-e fire jai
+            _current_span.set(parent)
+        _record(record)
+
+
+def traced(name):
+    """Decorator form of span() for plain functions."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(record):
+    name = record["name"]
+    seconds = record["duration_ms"] / 1000
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=TRACE_SAMPLES)
+            _totals[name] = [0, 0.0, 0]
+        samples.append(seconds)
+        totals = _totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += 1 if "error" in record else 0
+        _recent.append(record)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_summary() -> dict:
+    """span name -> count, errors, mean/p50/p95/p99 in milliseconds (over recent samples)."""
+    with _lock:
+        snapshot = {name: (sorted(samples), list(_totals[name])) for name, samples in _samples.items()}
+    summary = {}
+    for name, (values, (count, total, errors)) in sorted(snapshot.items()):
+        summary[name] = {
+            "count": count,
+            "errors": errors,
+            "mean_ms": total / count * 1000 if count else 0.0,
+            "p50_ms": _percentile(values, 0.50) * 1000,
+            "p95_ms": _percentile(values, 0.95) * 1000,
+            "p99_ms": _percentile(values, 0.99) * 1000,
+        }
+    return summary
+
+
+def export_jsonl(path=None) -> str:
+    """Recent span records as JSON lines; also written to path when one is given."""
+    with _lock:
+        records = list(_recent)
+    text = "".join(json.dumps(record, default=str) + "\n" for record in records)
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def prometheus_text() -> str:
+    """Latency summaries in the Prometheus text exposition format."""
+    lines = [
+        "# HELP yesai_span_duration_seconds Latency of traced spans.",
+        "# TYPE yesai_span_duration_seconds summary",
+    ]
+    error_lines = [
+        "# HELP yesai_span_errors_total Spans that raised an exception.",
+        "# TYPE yesai_span_errors_total counter",
+    ]
+    for name, stats in latency_summary().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        for quantile in ("0.5", "0.95", "0.99"):
+            key = {"0.5": "p50_ms", "0.95": "p95_ms", "0.99": "p99_ms"}[quantile]
+            lines.append(
+                f'yesai_span_duration_seconds{{span="{label}",quantile="{quantile}"}} {stats[key] / 1000:.6f}'
+            )
+        lines.append(f'yesai_span_duration_seconds_sum{{span="{label}"}} {stats["mean_ms"] * stats["count"] / 1000:.6f}')
+        lines.append(f'yesai_span_duration_seconds_count{{span="{label}"}} {stats["count"]}')
+        error_lines.append(f'yesai_span_errors_total{{span="{label}"}} {stats["errors"]}')
+    return "\n".join(lines + error_lines) + "\n"
+
+
+def reset():
+    """Clears every recorded sample (benchmarks, tests)."""
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _recent.clear()